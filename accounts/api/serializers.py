@@ -1,10 +1,20 @@
-from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import update_last_login
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Lower
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth import authenticate
 
+from accounts.authentication import deny_list_is_shared, is_denied
+from accounts.credentials import authenticate_credentials, hash_password
+from accounts.tokens import RefreshToken
 
 
 User = get_user_model()
@@ -14,35 +24,64 @@ class UserSerializer(serializers.ModelSerializer):
         max_length=128,
         min_length=8,
         write_only=True,
-        validators=[validate_password]
     )
 
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'password')
+        # Uniqueness is checked in validate() together with the email.
+        extra_kwargs = {'username': {'validators': [UnicodeUsernameValidator()]}}
+
+    def get_taken_message(self, username, email):
+        """
+        Return why the username or email cannot be used, in one query that
+        ignores case like the unique indexes on both columns.
+        """
+        query = Q(username_lower=Lower(Value(username)))
+        if email:
+            query |= Q(email_lower=Lower(Value(email))) & ~Q(email='')
+        taken_emails = list(
+            User.objects.alias(username_lower=Lower('username'), email_lower=Lower('email'))
+            .filter(query).values_list('email', flat=True)[:2]
+        )
+        if email and email.lower() in (taken_email.lower() for taken_email in taken_emails):
+            return 'Email address is already in use.'
+        if taken_emails:
+            return 'Username is already taken.'
+        return None
 
     def validate(self, attrs):
         email = attrs.get('email')
         username = attrs.get('username')
 
-        # Check if email is already taken
-        if email and User.objects.filter(email=email).exists():
-            raise serializers.ValidationError('Email address is already in use.')
+        message = self.get_taken_message(username, email)
+        if message:
+            raise serializers.ValidationError(message)
 
-        # Check if username is already taken
-        if username and User.objects.filter(username=username).exists():
-            raise serializers.ValidationError('Username is already taken.')
+        # Validated once, here, where the similarity check can see the other fields.
+        try:
+            validate_password(attrs['password'], User(username=username or '', email=email or ''))
+        except ValidationError as e:
+            raise serializers.ValidationError({'password': e.messages})
 
         return attrs
 
     def create(self, validated_data):
+        # What create_user does, with the only hash computed on the hashing pool.
+        password = validated_data.pop('password')
+        user = User(**validated_data)
+        user.username = User.normalize_username(user.username)
+        user.email = User.objects.normalize_email(user.email)
+        user.password = hash_password(password)
         try:
-            validate_password(validated_data['password'])
-        except ValidationError as e:
-            raise serializers.ValidationError({'password': e.messages})
-
-        validated_data['password'] = make_password(validated_data.get('password'))
-        user = User.objects.create_user(**validated_data)
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # A concurrent registration took the username or email after validate().
+            message = self.get_taken_message(user.username, user.email)
+            if message is None:
+                raise
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]})
         return user
 
 class LoginSerializer(serializers.Serializer):
@@ -55,7 +94,7 @@ class LoginSerializer(serializers.Serializer):
         password = attrs.get('password')
 
         if username and password:
-            user = authenticate(username=username, password=password)
+            user = authenticate_credentials(username, password)
 
             if not user:
                 raise serializers.ValidationError('Invalid username or password.')
@@ -65,3 +104,52 @@ class LoginSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class TokenObtainPairSerializer(jwt_serializers.TokenObtainPairSerializer):
+    """
+    Issue a token pair like simplejwt, but check the credentials the way the
+    login endpoint does: on the password hashing pool, re-hashing outdated
+    passwords, instead of through ``django.contrib.auth.authenticate``.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        self.user = authenticate_credentials(attrs[self.username_field], attrs['password'])
+        if not jwt_settings.USER_AUTHENTICATION_RULE(self.user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        refresh = self.get_token(self.user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, self.user)
+        return data
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """
+    Refresh an access token from the token's signature and the cached
+    deny-list alone, without a query, so deactivated users are refused too.
+
+    A deny-list that only lives in this process would miss deactivations
+    handled by the others; the user row is checked instead then.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.get(jwt_settings.USER_ID_CLAIM)
+        if deny_list_is_shared():
+            denied = is_denied(user_id)
+        else:
+            denied = not User.objects.filter(pk=user_id, is_active=True).exists()
+        if denied:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
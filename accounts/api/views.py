@@ -1,33 +1,38 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from accounts.throttling import FailFastThrottleMixin, IPRateThrottle, UsernameRateThrottle
+from accounts.tokens import issue_tokens
 from .serializers import UserSerializer, LoginSerializer
 
 
-class RegistrationAPIView(APIView):
+class RegistrationAPIView(FailFastThrottleMixin, APIView):
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
+
     def post(self, request):
         serializer = UserSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': serializer.data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }, status=status.HTTP_201_CREATED)
+            return Response({'user': serializer.data, **issue_tokens(user)}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class LoginAPIView(APIView):
+class LoginAPIView(FailFastThrottleMixin, APIView):
+    # Checked before the password is, so throttled attempts never reach the hashing pool.
+    throttle_classes = [IPRateThrottle, UsernameRateThrottle]
+    throttle_scope = 'login'
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'user': UserSerializer(user).data,
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }, status=status.HTTP_200_OK)
+            return Response({'user': UserSerializer(user).data, **issue_tokens(user)}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ThrottledTokenObtainPairView(FailFastThrottleMixin, TokenObtainPairView):
+    throttle_classes = [IPRateThrottle, UsernameRateThrottle]
+    throttle_scope = 'login'
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+DENYLIST_KEY = 'auth:denied:{user_id}'
+
+# Backends whose entries live in one process only.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def get_deny_list_cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def deny_list_is_shared():
+    """
+    Return whether a deny-list entry reaches every server process.
+    """
+    return settings.CACHES[settings.AUTH_CACHE_ALIAS]['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def deny_user(user_id):
+    """
+    Reject every outstanding token of a user until they can no longer be refreshed.
+    """
+    timeout = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds()
+    get_deny_list_cache().set(DENYLIST_KEY.format(user_id=user_id), True, timeout=timeout)
+
+
+def allow_user(user_id):
+    get_deny_list_cache().delete(DENYLIST_KEY.format(user_id=user_id))
+
+
+def is_denied(user_id):
+    return get_deny_list_cache().get(DENYLIST_KEY.format(user_id=user_id), False)
+
+
+class LazyTokenUser(TokenUser):
+    """
+    A user backed by the validated token that loads the ``CustomUser`` row only
+    when a view reads a field the token does not carry.
+    """
+
+    @cached_property
+    def instance(self):
+        try:
+            return User.objects.get(pk=self.pk)
+        except User.DoesNotExist:
+            # Deleted after its deny-list entry expired.
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+    @cached_property
+    def username(self):
+        if 'username' in self.token:
+            return self.token['username']
+        return self.instance.username
+
+    @cached_property
+    def is_active(self):
+        # Deactivated users are refused through the deny-list, but a
+        # process-local one may not have heard of it.
+        if 'is_active' in self.token:
+            return self.token['is_active']
+        return self.instance.is_active
+
+    @cached_property
+    def is_staff(self):
+        if 'is_staff' in self.token:
+            return self.token['is_staff']
+        return self.instance.is_staff
+
+    @cached_property
+    def is_superuser(self):
+        if 'is_superuser' in self.token:
+            return self.token['is_superuser']
+        return self.instance.is_superuser
+
+    def __str__(self):
+        return self.username
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return getattr(self.instance, attr)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that trusts the signed ``user_id`` claim instead of
+    selecting the user on every request.
+
+    Deactivated and deleted users are refused through a cached deny-list
+    maintained by the ``accounts`` signals.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        user = LazyTokenUser(validated_token)
+        if is_denied(user.pk):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from accounts.authentication import deny_list_is_shared
+
+
+@register(Tags.caches)
+def check_deny_list_cache(app_configs, **kwargs):
+    authentication_classes = settings.REST_FRAMEWORK.get('DEFAULT_AUTHENTICATION_CLASSES', [])
+    if 'accounts.authentication.StatelessJWTAuthentication' not in authentication_classes:
+        return []
+    if deny_list_is_shared():
+        return []
+    return [Error(
+        f'Stateless JWT authentication needs a shared cache for the deny-list, but the '
+        f'{settings.AUTH_CACHE_ALIAS!r} cache only lives in one process.',
+        hint='Set AUTH_CACHE_BACKEND and AUTH_CACHE_LOCATION (or CACHE_BACKEND and CACHE_LOCATION) '
+             'to a memcached or Redis server.',
+        id='accounts.E001',
+    )]
@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher, is_password_usable, make_password
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+User = get_user_model()
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many sign-ins at once, try again shortly.')
+    default_code = 'hashing_busy'
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASHING_WORKERS,
+                                           thread_name_prefix='password-hashing')
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASHING_WORKERS + settings.PASSWORD_HASHING_QUEUE)
+        return _executor, _slots
+
+
+def run_hashing(func, *args):
+    """
+    Run a password hashing function on the bounded hashing pool.
+
+    At most ``PASSWORD_HASHING_WORKERS`` hashes run at once, however many
+    requests arrive, so a burst of sign-ins cannot take every CPU from the
+    other requests. A request that cannot even queue within
+    ``PASSWORD_HASHING_TIMEOUT`` seconds fails with ``HashingBusy``.
+    """
+    executor, slots = get_executor()
+    if not slots.acquire(timeout=settings.PASSWORD_HASHING_TIMEOUT):
+        raise HashingBusy()
+    try:
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def hash_password(password):
+    return run_hashing(make_password, password)
+
+
+def verify_password(password, encoded):
+    """
+    ``check_password`` returning ``(valid, must_update)`` instead of calling a
+    setter, so that only the hash itself runs on the pool.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False, False
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, False
+
+    preferred = get_hasher('default')
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    valid = hasher.verify(password, encoded)
+    if not valid and not hasher_changed and must_update:
+        # Keep failed checks as slow as successful ones, like check_password.
+        hasher.harden_runtime(password, encoded)
+    return valid, must_update
+
+
+def check_user_password(user, password):
+    """
+    Check a user's password, re-hashing it with the current hasher and cost
+    when the stored hash is outdated.
+    """
+    valid, must_update = run_hashing(verify_password, password, user.password)
+    if valid and must_update:
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return valid
+
+
+def authenticate_credentials(username, password):
+    """
+    Return the active user with these credentials, or None, as the model
+    backend's ``authenticate`` would, with every hash on the hashing pool.
+    """
+    try:
+        user = User._default_manager.get_by_natural_key(username)
+    except User.DoesNotExist:
+        # Hash anyway so the response time does not tell whether the user exists.
+        hash_password(password)
+        return None
+    if not check_user_password(user, password) or not user.is_active:
+        return None
+    return user
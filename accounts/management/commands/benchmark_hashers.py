@@ -0,0 +1,59 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ('Time each configured password hasher on this machine and suggest the cost settings '
+            'that take --target-ms per hash.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250)
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Preferred hasher: {settings.PASSWORD_HASHER_PROFILE}; '
+                          f'{settings.PASSWORD_HASHING_WORKERS} hashing workers.')
+        for profile in settings.PASSWORD_HASHER_PROFILES:
+            hasher = get_hasher(self.get_algorithm(profile))
+            try:
+                hasher.encode('benchmark', hasher.salt())
+            except (ImportError, ValueError) as e:
+                self.stdout.write(f'{profile}: unavailable ({e})')
+                continue
+
+            elapsed = self.measure(hasher, options['rounds'])
+            self.stdout.write(f'{profile}: {elapsed * 1000:.0f}ms per hash, '
+                              f'{settings.PASSWORD_HASHING_WORKERS / elapsed:.1f} logins/s per process')
+            self.stdout.write(f'  for {options["target_ms"]:.0f}ms: '
+                              f'{self.suggest(profile, elapsed, options["target_ms"] / 1000)}')
+
+    def get_algorithm(self, profile):
+        return {'pbkdf2': 'pbkdf2_sha256', 'argon2': 'argon2', 'scrypt': 'scrypt'}[profile]
+
+    def measure(self, hasher, rounds):
+        timings = []
+        for _ in range(rounds):
+            salt = hasher.salt()
+            started = time.perf_counter()
+            hasher.encode('benchmark', salt)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def suggest(self, profile, elapsed, target):
+        # Time grows linearly with iterations, time cost and work factor.
+        scale = target / elapsed
+        if profile == 'pbkdf2':
+            return f'PASSWORD_PBKDF2_ITERATIONS={max(int(settings.PASSWORD_PBKDF2_ITERATIONS * scale), 100000)}'
+        if profile == 'argon2':
+            return f'PASSWORD_ARGON2_TIME_COST={max(round(settings.PASSWORD_ARGON2_TIME_COST * scale), 1)}'
+        # The scrypt work factor must be a power of two.
+        n = settings.PASSWORD_SCRYPT_WORK_FACTOR
+        while n * 2 <= settings.PASSWORD_SCRYPT_WORK_FACTOR * scale:
+            n *= 2
+        while n > 2 ** 10 and n > settings.PASSWORD_SCRYPT_WORK_FACTOR * scale:
+            n //= 2
+        return f'PASSWORD_SCRYPT_WORK_FACTOR={n}'
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+from accounts.tokens import AccessToken, make_token_backend
+
+
+def generate_key_pair(algorithm):
+    """
+    Return ``(signing_key, verifying_key)`` PEM strings for an RS* or ES* algorithm.
+    """
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm.startswith('RS'):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        curve = {'ES256': ec.SECP256R1, 'ES384': ec.SECP384R1, 'ES512': ec.SECP521R1}[algorithm]
+        private_key = ec.generate_private_key(curve())
+    signing_key = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                            serialization.NoEncryption())
+    verifying_key = private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                          serialization.PublicFormat.SubjectPublicKeyInfo)
+    return signing_key.decode(), verifying_key.decode()
+
+
+class Command(BaseCommand):
+    help = ('Time signing and verifying an access token with each JWT algorithm, with keys parsed per call '
+            'as simplejwt does and parsed once as accounts.tokens does.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algorithms', nargs='+', default=['HS256', 'RS256', 'ES256'])
+        parser.add_argument('--rounds', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Configured: {settings.JWT_ALGORITHM}')
+        payload = AccessToken().payload
+        payload['user_id'] = 1
+        for algorithm in options['algorithms']:
+            try:
+                if algorithm.startswith('HS'):
+                    keys = settings.SECRET_KEY, ''
+                else:
+                    keys = generate_key_pair(algorithm)
+                backends = {
+                    'per call': TokenBackend(algorithm, *keys),
+                    'parsed once': make_token_backend(algorithm, *keys),
+                }
+            except (ImportError, KeyError, TokenBackendError) as e:
+                self.stdout.write(f'{algorithm}: unavailable ({e!r})')
+                continue
+
+            for name, backend in backends.items():
+                sign, verify = self.measure(backend, payload, options['rounds'])
+                self.stdout.write(f'{algorithm} keys {name}: sign {sign * 1e6:.0f}µs, verify {verify * 1e6:.0f}µs, '
+                                  f'{1 / (sign + verify):.0f} refreshes/s per core')
+
+    def measure(self, backend, payload, rounds):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            token = backend.encode(payload)
+        signed = time.perf_counter()
+        for _ in range(rounds):
+            backend.decode(token)
+        verified = time.perf_counter()
+        return (signed - started) / rounds, (verified - signed) / rounds
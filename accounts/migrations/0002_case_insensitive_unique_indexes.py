@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-18 21:05
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Refuse to build the indexes over usernames or emails that differ only in
+    case, naming them so they can be merged or renamed first.
+    """
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    users = CustomUser.objects.using(schema_editor.connection.alias)
+    problems = []
+    for field in ('username', 'email'):
+        duplicates = (
+            users.exclude(**{field: ''}).annotate(value=Lower(field)).values('value')
+            .annotate(count=Count('pk')).filter(count__gt=1).values_list('value', flat=True)
+        )
+        for value in duplicates:
+            ids = users.annotate(value=Lower(field)).filter(value=value).order_by('pk').values_list('pk', flat=True)
+            problems.append(f'{field} {value!r}: users {", ".join(map(str, ids))}')
+    if problems:
+        raise RuntimeError(
+            'These accounts clash once case is ignored; rename or merge them before migrating:\n'
+            + '\n'.join(problems)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    # Django 3.2 cannot express unique constraints over expressions.
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX customuser_email_ci_uniq ON accounts_customuser (LOWER(email)) WHERE email <> ''",
+            'DROP INDEX customuser_email_ci_uniq',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX customuser_username_ci_uniq ON accounts_customuser (LOWER(username))',
+            'DROP INDEX customuser_username_ci_uniq',
+        ),
+    ]
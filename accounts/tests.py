@@ -1,14 +1,33 @@
-from django.test import TestCase
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache, caches
+from django.test import TestCase, override_settings
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from accounts.api.serializers import UserSerializer
+from accounts.authentication import StatelessJWTAuthentication
+from accounts.checks import check_deny_list_cache
+from accounts.credentials import authenticate_credentials, run_hashing
+from accounts.throttling import IPRateThrottle, SlidingWindowRateThrottle
+from accounts.tokens import make_token_backend
+from resumes.api.views import SkillListCreateAPIView
+
 User = get_user_model()
 
 
 class UserRegistrationTestCase(TestCase):
     def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
         self.client = APIClient()
         self.register_url = reverse('register')
 
@@ -34,6 +53,45 @@ class UserRegistrationTestCase(TestCase):
         self.assertEqual(User.objects.get().username, 'testuser')
         self.assertEqual(User.objects.get().email, 'testuser@example.com')
 
+    def test_register_hashes_password_once(self):
+        data = {'username': 'testuser', 'email': 'testuser@example.com', 'password': 'StrongPassword123'}
+        with mock.patch('accounts.credentials.make_password', wraps=make_password) as hashed:
+            response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(hashed.call_count, 1)
+        response = self.client.post(reverse('login'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_register_with_taken_email_or_username(self):
+        User.objects.create_user(username='TestUser', email='TestUser@Example.com', password='StrongPassword123')
+        data = {'username': 'other', 'email': 'testuser@example.com', 'password': 'StrongPassword123'}
+        serializer = UserSerializer(data=data)
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors['non_field_errors'], ['Email address is already in use.'])
+
+        data = {'username': 'testuser', 'email': 'other@example.com', 'password': 'StrongPassword123'}
+        response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ['Username is already taken.'])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_register_race_is_reported_as_validation_error(self):
+        User.objects.create_user(username='testuser', email='testuser@example.com', password='StrongPassword123')
+        data = {'username': 'TESTUSER', 'email': 'other@example.com', 'password': 'StrongPassword123'}
+        # The other registration commits between validate() and the insert.
+        with mock.patch.object(UserSerializer, 'get_taken_message', side_effect=[None, 'Username is already taken.']):
+            response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ['Username is already taken.'])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_blank_emails_are_not_unique(self):
+        User.objects.create_user(username='first', password='StrongPassword123')
+        data = {'username': 'second', 'email': '', 'password': 'StrongPassword123'}
+        response = self.client.post(self.register_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_login(self):
         user = User.objects.create_user(username='testuser', email='testuser@example.com', password='StrongPassword123')
         url = reverse('login')
@@ -47,3 +105,279 @@ class UserRegistrationTestCase(TestCase):
         self.assertIn('refresh', response.data)
         self.assertEqual(response.data['user']['username'], 'testuser')
         self.assertEqual(response.data['user']['email'], 'testuser@example.com')
+
+
+class PasswordHashingTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='StrongPassword123')
+
+    @override_settings(PASSWORD_HASHERS=['accounts.hashers.ScryptPasswordHasher'],
+                       PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10)
+    def test_scrypt_round_trip(self):
+        encoded = make_password('StrongPassword123')
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.user.password = encoded
+        self.user.save()
+        self.assertEqual(authenticate_credentials('testuser', 'StrongPassword123'), self.user)
+        self.assertIsNone(authenticate_credentials('testuser', 'WrongPassword123'))
+
+    def test_rehashes_outdated_password_on_login(self):
+        with override_settings(PASSWORD_HASHERS=['accounts.hashers.ScryptPasswordHasher',
+                                                 'accounts.hashers.TunedPBKDF2PasswordHasher'],
+                               PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10):
+            self.assertIsNone(authenticate_credentials('testuser', 'WrongPassword123'))
+            self.user.refresh_from_db()
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'pbkdf2_sha256')
+
+            self.assertEqual(authenticate_credentials('testuser', 'StrongPassword123'), self.user)
+            self.user.refresh_from_db()
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'scrypt')
+
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 11):
+            self.assertEqual(authenticate_credentials('testuser', 'StrongPassword123'), self.user)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$260000$'))
+
+    def test_token_endpoint_hashes_on_pool_and_rehashes(self):
+        with override_settings(PASSWORD_HASHERS=['accounts.hashers.ScryptPasswordHasher',
+                                                 'accounts.hashers.TunedPBKDF2PasswordHasher'],
+                               PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10), \
+                mock.patch('rest_framework_simplejwt.serializers.authenticate') as authenticate, \
+                mock.patch('accounts.credentials.run_hashing', wraps=run_hashing) as hashing:
+            response = APIClient().post(reverse('token_obtain_pair'),
+                                        {'username': 'testuser', 'password': 'StrongPassword123'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('refresh', response.data)
+            self.assertEqual(AccessToken(response.data['access'])['user_id'], self.user.pk)
+            self.assertTrue(hashing.called)
+            authenticate.assert_not_called()
+            self.user.refresh_from_db()
+            self.assertEqual(identify_hasher(self.user.password).algorithm, 'scrypt')
+
+            response = APIClient().post(reverse('token_obtain_pair'),
+                                        {'username': 'testuser', 'password': 'WrongPassword123'})
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response.data['code'], 'no_active_account')
+
+    def test_inactive_and_unknown_users_are_refused(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(authenticate_credentials('testuser', 'StrongPassword123'))
+        self.assertIsNone(authenticate_credentials('nobody', 'StrongPassword123'))
+
+    @override_settings(PASSWORD_HASHING_TIMEOUT=0)
+    def test_busy_hashing_pool_returns_503(self):
+        with mock.patch('accounts.credentials.get_executor', return_value=(None, threading.Semaphore(0))):
+            response = APIClient().post(reverse('login'), {'username': 'testuser', 'password': 'StrongPassword123'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data['detail'].code, 'hashing_busy')
+
+
+@mock.patch.object(SlidingWindowRateThrottle, 'THROTTLE_RATES', {
+    'login_ip': '4/min', 'login_username': '2/min', 'register_ip': '1/hour'})
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
+        self.client = APIClient()
+        User.objects.create_user(username='testuser', password='StrongPassword123')
+        # Fixed at the start of a window, so that no test crosses into the next.
+        timer = mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=60 * 1000)
+        timer.start()
+        self.addCleanup(timer.stop)
+
+    def login(self, username, url='login', **extra):
+        return self.client.post(reverse(url), {'username': username, 'password': 'WrongPassword123'}, **extra)
+
+    def test_login_is_throttled_per_username_before_checking_password(self):
+        self.assertEqual(self.login('testuser').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login('TESTUSER').status_code, status.HTTP_400_BAD_REQUEST)
+        with mock.patch('accounts.api.serializers.authenticate_credentials') as authenticate:
+            response = self.login('testuser', REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        authenticate.assert_not_called()
+        self.assertEqual(self.login('other').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_is_throttled_per_ip(self):
+        for i in range(4):
+            self.assertEqual(self.login(f'user{i}').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login('user4').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login('user4', REMOTE_ADDR='10.0.0.2').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_token_endpoint_shares_login_limits(self):
+        self.login('testuser')
+        self.login('testuser', url='token_obtain_pair')
+        self.assertEqual(self.login('testuser', url='token_obtain_pair').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_non_object_body_is_rejected(self):
+        for url in ('login', 'token_obtain_pair'):
+            for i, body in enumerate(([], 'x', 1)):
+                with self.subTest(url=url, body=body):
+                    response = self.client.post(reverse(url), body, format='json', REMOTE_ADDR=f'10.0.1.{i}')
+                    self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_register_is_throttled_per_ip(self):
+        data = {'username': 'first', 'email': 'first@example.com', 'password': 'StrongPassword123'}
+        self.assertEqual(self.client.post(reverse('register'), data).status_code, status.HTTP_201_CREATED)
+        data = {'username': 'second', 'email': 'second@example.com', 'password': 'StrongPassword123'}
+        self.assertEqual(self.client.post(reverse('register'), data).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        for i in range(2):
+            data = {'username': f'user{i}', 'email': f'user{i}@example.com', 'password': 'StrongPassword123'}
+            response = self.client.post(reverse('register'), data, HTTP_X_FORWARDED_FOR=f'10.0.2.{i}' * 100)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        with self.settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, NUM_PROXIES=1)):
+            request = APIRequestFactory().post('/', HTTP_X_FORWARDED_FOR='1' * 1000)
+            view = mock.Mock(throttle_scope='register')
+            throttle = IPRateThrottle()
+            self.assertTrue(throttle.allow_request(request, view))
+            self.assertLess(len(throttle.key), 100)
+
+    def test_window_slides(self):
+        with mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=60 * 1000 + 30):
+            self.login('testuser')
+            self.login('testuser')
+            response = self.login('testuser')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+        # Half way into the next window, the previous one still weighs 2 * 0.5.
+        with mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=60 * 1001 + 30):
+            self.assertEqual(self.login('testuser').status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(self.login('testuser').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with mock.patch.object(SlidingWindowRateThrottle, 'timer', return_value=60 * 1002 + 1):
+            self.assertEqual(self.login('testuser').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TokenRefreshTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
+        self.user = User.objects.create_user(username='testuser', password='StrongPassword123')
+        self.refresh = str(RefreshToken.for_user(self.user))
+        self.url = reverse('token_refresh')
+
+    @mock.patch('accounts.api.serializers.deny_list_is_shared', return_value=True)
+    def test_refresh_without_queries(self, shared):
+        with self.assertNumQueries(0):
+            response = APIClient().post(self.url, {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['user_id'], self.user.pk)
+
+    def test_refresh_is_refused_to_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+        for shared in (True, False):
+            with mock.patch('accounts.api.serializers.deny_list_is_shared', return_value=shared):
+                response = APIClient().post(self.url, {'refresh': self.refresh}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_process_local_deny_list_falls_back_to_database(self):
+        # Deactivated by another process: this one's deny-list never heard of it.
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        with self.assertNumQueries(1):
+            response = APIClient().post(self.url, {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rejects_access_token(self):
+        access = str(AccessToken.for_user(self.user))
+        response = APIClient().post(self.url, {'refresh': access}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_parsed_keys_sign_like_simplejwt(self):
+        backend = make_token_backend('HS256', 'secret')
+        token = backend.encode({'user_id': 1})
+        self.assertEqual(TokenBackend('HS256', 'secret').decode(token), {'user_id': 1})
+
+    def test_asymmetric_keys_are_parsed_once(self):
+        try:
+            from accounts.management.commands.benchmark_jwt import generate_key_pair
+            signing_key, verifying_key = generate_key_pair('ES256')
+        except ImportError:
+            self.skipTest('cryptography is not installed')
+        backend = make_token_backend('ES256', signing_key, verifying_key)
+        self.assertNotIsInstance(backend.signing_key, str)
+        token = backend.encode({'user_id': 1})
+        self.assertEqual(TokenBackend('ES256', signing_key, verifying_key).decode(token), {'user_id': 1})
+
+
+class StatelessJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        caches['auth'].clear()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', password='StrongPassword123')
+        self.authentication = StatelessJWTAuthentication()
+        self.token = AccessToken.for_user(self.user)
+        self.factory = APIRequestFactory()
+
+    def authenticate(self):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return self.authentication.authenticate(request)
+
+    def test_authenticates_without_queries(self):
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_authenticated)
+
+    def test_loads_user_lazily(self):
+        user, _ = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.first_name, 'Jane')
+            self.assertFalse(user.is_staff)
+
+    def test_username_and_active_flag_come_from_the_user(self):
+        user, _ = self.authenticate()
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, 'testuser')
+            self.assertEqual(str(user), 'testuser')
+            self.assertTrue(user.is_active)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user, _ = self.authenticate()
+        self.assertFalse(user.is_active)
+
+    def test_deactivated_user_is_denied(self):
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+        self.user.is_active = True
+        self.user.save()
+        user, _ = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_deleted_user_is_denied(self):
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deleted_user_without_deny_entry_is_denied(self):
+        user, _ = self.authenticate()
+        User.objects.filter(pk=self.user.pk).delete()
+        with self.assertRaises(AuthenticationFailed):
+            user.email
+
+    def test_deny_list_cache_check(self):
+        classes = ['accounts.authentication.StatelessJWTAuthentication']
+        with override_settings(REST_FRAMEWORK={'DEFAULT_AUTHENTICATION_CLASSES': classes}):
+            self.assertEqual([error.id for error in check_deny_list_cache(None)], ['accounts.E001'])
+            with mock.patch('accounts.checks.deny_list_is_shared', return_value=True):
+                self.assertEqual(check_deny_list_cache(None), [])
+        self.assertEqual(check_deny_list_cache(None), [])
+
+    @mock.patch.object(SkillListCreateAPIView, 'authentication_classes', [StatelessJWTAuthentication])
+    def test_section_views_accept_token_user(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        url = reverse('resumes:skills-list-create')
+        response = client.post(url, {'title': 'Programming', 'rate': 4})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['user'], self.user.pk)
+        response = client.get(url)
+        self.assertEqual(len(response.data['results']), 1)
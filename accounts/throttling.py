@@ -0,0 +1,114 @@
+import hashlib
+import math
+from collections.abc import Mapping
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    A rate throttle counting requests in a sliding window.
+
+    Unlike ``SimpleRateThrottle``, which keeps a list of request timestamps
+    per key, it keeps one counter per fixed window and weighs the previous
+    window by how much of it still overlaps the sliding one. A check costs a
+    single ``get_many`` and an allowed request one ``incr``, whatever the
+    rate; rejected requests write nothing.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now / self.duration, 1)
+        current_key, previous_key = f'{self.key}:{int(window)}', f'{self.key}:{int(window) - 1}'
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous, self.current = counts.get(previous_key, 0), counts.get(current_key, 0)
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            return False
+
+        try:
+            self.cache.incr(current_key)
+        except ValueError:
+            # The counter outlives its own window to weigh the next one.
+            if not self.cache.add(current_key, 1, self.duration * 2):
+                self.cache.incr(current_key)
+        return True
+
+    def wait(self):
+        remaining = 1 - self.elapsed
+        if self.current >= self.num_requests or not self.previous:
+            return math.ceil(remaining * self.duration)
+        # When the previous window's weight has decayed enough to let one more in.
+        overlap = (self.num_requests - self.current) / self.previous
+        return math.ceil(max(remaining - overlap, 0) * self.duration) or 1
+
+
+class ScopedSlidingWindowRateThrottle(SlidingWindowRateThrottle):
+    """
+    Like ``ScopedRateThrottle``, takes its rate from the view's
+    ``throttle_scope``, suffixed with what it counts by: the ``login`` scope
+    reads the ``login_ip`` and ``login_username`` rates.
+    """
+    ident_name = None
+
+    def __init__(self):
+        # The rate is only known once the view is.
+        pass
+
+    def allow_request(self, request, view):
+        self.scope = f'{view.throttle_scope}_{self.ident_name}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        ident = self.get_throttle_ident(request)
+        if not ident:
+            return None
+        # Idents come from the client; hashed, any of them makes a valid cache key.
+        return self.cache_format % {'scope': self.scope, 'ident': hashlib.sha1(ident.encode()).hexdigest()}
+
+    def get_throttle_ident(self, request):
+        raise NotImplementedError('.get_throttle_ident() must be overridden')
+
+
+class IPRateThrottle(ScopedSlidingWindowRateThrottle):
+    ident_name = 'ip'
+
+    def get_throttle_ident(self, request):
+        return self.get_ident(request)
+
+
+class UsernameRateThrottle(ScopedSlidingWindowRateThrottle):
+    """
+    Counts by submitted username, whatever the client IP, so that credential
+    stuffing spread over many addresses is slowed down too.
+    """
+    ident_name = 'username'
+
+    def get_throttle_ident(self, request):
+        # Bodies that are not JSON objects are left for the serializer to reject.
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return username.lower()
+
+
+class FailFastThrottleMixin:
+    """
+    Stop at the first throttle that refuses the request. DRF asks every
+    throttle so it can report the longest wait, which would still count the
+    rejected request against the other throttles and cost their round trips.
+    """
+
+    def check_throttles(self, request):
+        for throttle in self.get_throttles():
+            if not throttle.allow_request(request, self):
+                self.throttled(request, throttle.wait())
@@ -0,0 +1,51 @@
+from functools import lru_cache
+
+from jwt.algorithms import get_default_algorithms
+from rest_framework_simplejwt import tokens
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.settings import api_settings
+
+
+def make_token_backend(algorithm, signing_key, verifying_key=''):
+    """
+    Return a ``TokenBackend`` whose keys are already parsed.
+
+    simplejwt hands PyJWT the configured key strings, which PyJWT parses again
+    for every signature and every check; for RSA and EC keys parsing the PEM
+    costs more than the signature itself.
+    """
+    backend = TokenBackend(algorithm, signing_key, verifying_key, api_settings.AUDIENCE, api_settings.ISSUER,
+                           api_settings.JWK_URL, api_settings.LEEWAY, api_settings.JSON_ENCODER)
+    prepare_key = get_default_algorithms()[algorithm].prepare_key
+    if signing_key:
+        backend.signing_key = prepare_key(signing_key)
+    if verifying_key:
+        backend.verifying_key = prepare_key(verifying_key)
+    return backend
+
+
+@lru_cache(maxsize=None)
+def get_token_backend():
+    return make_token_backend(api_settings.ALGORITHM, api_settings.SIGNING_KEY, api_settings.VERIFYING_KEY)
+
+
+class CachedBackendMixin:
+    @property
+    def token_backend(self):
+        return get_token_backend()
+
+
+class AccessToken(CachedBackendMixin, tokens.AccessToken):
+    pass
+
+
+class RefreshToken(CachedBackendMixin, tokens.RefreshToken):
+    access_token_class = AccessToken
+
+
+def issue_tokens(user):
+    """
+    Return a new refresh token and its access token for ``user``, encoded.
+    """
+    refresh = RefreshToken.for_user(user)
+    return {'refresh': str(refresh), 'access': str(refresh.access_token)}
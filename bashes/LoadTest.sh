@@ -0,0 +1,23 @@
+# Compare runserver with the gunicorn serving modes on the same endpoint.
+# Usage, inside the container: bash ./bashes/LoadTest.sh <access token> [path] [concurrency] [requests]
+TOKEN="$1"
+TARGET="${2:-/api/resume/}"
+CONCURRENCY="${3:-50}"
+REQUESTS="${4:-2000}"
+
+run() {
+  echo "== $1 =="
+  shift
+  "$@" > /tmp/loadtest-server.log 2>&1 &
+  SERVER=$!
+  sleep 3
+  python3 manage.py loadtest "http://127.0.0.1:8001${TARGET}" --token "$TOKEN" \
+    --concurrency "$CONCURRENCY" --requests "$REQUESTS"
+  kill "$SERVER"
+  wait "$SERVER" 2>/dev/null
+}
+
+run runserver python3 manage.py runserver 127.0.0.1:8001 --noreload
+run gunicorn env SERVER_BIND=127.0.0.1:8001 SERVER_ACCESS_LOG= gunicorn config.wsgi -c config/gunicorn.conf.py
+run "gunicorn + uvicorn" env SERVER_BIND=127.0.0.1:8001 SERVER_ACCESS_LOG= \
+  SERVER_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn config.asgi -c config/gunicorn.conf.py
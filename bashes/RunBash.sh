@@ -1 +1,13 @@
-python3 manage.py runserver 0.0.0.0:8000
\ No newline at end of file
+# SERVER_MODE picks the server: dev (runserver), wsgi (gunicorn) or asgi (gunicorn with uvicorn workers).
+# Worker settings are read from the environment by config/gunicorn.conf.py.
+case "${SERVER_MODE:-dev}" in
+  wsgi)
+    exec gunicorn config.wsgi -c config/gunicorn.conf.py
+    ;;
+  asgi)
+    SERVER_WORKER_CLASS=uvicorn.workers.UvicornWorker exec gunicorn config.asgi -c config/gunicorn.conf.py
+    ;;
+  *)
+    exec python3 manage.py runserver 0.0.0.0:8000
+    ;;
+esac
@@ -0,0 +1,71 @@
+"""
+Gunicorn settings for production serving, driven by environment variables.
+
+    gunicorn config.wsgi -c config/gunicorn.conf.py
+    SERVER_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn config.asgi -c config/gunicorn.conf.py
+"""
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv('SERVER_BIND', '0.0.0.0:8000')
+
+# Pre-forked worker processes; threads > 1 switches the sync worker to gthread.
+workers = int(os.getenv('SERVER_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('SERVER_THREADS', 1))
+worker_class = os.getenv('SERVER_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import Django once in the master so workers share its memory copy-on-write.
+preload_app = os.getenv('SERVER_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Recycle workers after a jittered number of requests to bound memory growth.
+max_requests = int(os.getenv('SERVER_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('SERVER_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('SERVER_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('SERVER_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('SERVER_KEEPALIVE', 5))
+
+accesslog = os.getenv('SERVER_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('SERVER_LOG_LEVEL', 'info')
+
+# Workers save their request metrics here, so that /metrics can sum them.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
+
+PROCESS_LOCAL_CACHES = (
+    '',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def on_starting(server):
+    # Each worker would keep its own resume versions, throttle counters and
+    # JWT deny-list, so a version bump or a logout would only reach one of them.
+    if workers > 1 and os.getenv('CACHE_BACKEND', '') in PROCESS_LOCAL_CACHES:
+        server.log.error('%s workers need a shared cache: set CACHE_BACKEND and CACHE_LOCATION, '
+                         'or SERVER_WORKERS=1.', workers)
+        sys.exit(1)
+    if METRICS_DIR:
+        from utils.metrics import reset_metrics
+        reset_metrics(METRICS_DIR)
+
+
+def worker_exit(server, worker):
+    if METRICS_DIR:
+        from utils.metrics import save_process_metrics
+        save_process_metrics(METRICS_DIR, force=True)
+
+
+def child_exit(server, worker):
+    if METRICS_DIR:
+        from utils.metrics import archive_process_metrics
+        archive_process_metrics(METRICS_DIR, worker.pid)
+
+
+def post_fork(server, worker):
+    # Connections opened while preloading would be shared by every worker.
+    from django.db import connections
+    connections.close_all()
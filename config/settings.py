@@ -32,6 +32,7 @@ INSTALLED_APPS = [
 
     'accounts',
     'resumes',
+    'tasks',
 
     'rest_framework',
     'rest_framework_simplejwt',
@@ -40,7 +41,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'utils.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # gunicorn serves no static files; the admin and Swagger assets come from here.
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -49,6 +53,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request metrics are served at /metrics to these addresses; a request running one
+# statement more than METRICS_REPEATED_QUERY_THRESHOLD times is logged as a likely N+1.
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+METRICS_REPEATED_QUERY_THRESHOLD = int(os.getenv('METRICS_REPEATED_QUERY_THRESHOLD', 10))
+METRICS_SERVER_TIMING = os.getenv('METRICS_SERVER_TIMING', 'true').lower() in ('1', 'true', 'yes')
+# A directory shared by the gunicorn workers, so that /metrics sums all of them
+# rather than serving the worker that happened to take the scrape.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -74,18 +87,100 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # PostgreSQL with the connection health checks of Django 4.1.
+        'ENGINE': 'utils.backends.postgresql',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT'),
+        # Keep connections open across requests; 0 closes them after each one.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Probe a reused connection with a cheap query on its first use in each request.
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+        # Required behind PgBouncer in transaction pooling mode.
+        'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', '').lower() in ('1', 'true', 'yes'),
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+    # The JWT deny-list, apart from the resume documents and throttle counters
+    # so that nothing evicts it. It has to be shared by every server process.
+    'auth': {
+        'BACKEND': os.getenv('AUTH_CACHE_BACKEND', os.getenv('CACHE_BACKEND',
+                                                             'django.core.cache.backends.locmem.LocMemCache')),
+        'LOCATION': os.getenv('AUTH_CACHE_LOCATION', os.getenv('CACHE_LOCATION', 'auth')),
+        'KEY_PREFIX': 'auth',
+        'TIMEOUT': None,
+    },
+}
+
+AUTH_CACHE_ALIAS = 'auth'
+
+RESUME_CACHE_ALIAS = 'default'
+RESUME_CACHE_TIMEOUT = int(os.getenv('RESUME_CACHE_TIMEOUT', 60 * 60))
+
+# Public resume links: browsers revalidate after RESUME_PUBLIC_MAX_AGE, shared
+# caches keep a copy for RESUME_PUBLIC_SHARED_MAX_AGE unless purged earlier by
+# RESUME_PURGE_HANDLER, a dotted path to a callable taking surrogate keys.
+RESUME_PUBLIC_MAX_AGE = int(os.getenv('RESUME_PUBLIC_MAX_AGE', 60))
+RESUME_PUBLIC_SHARED_MAX_AGE = int(os.getenv('RESUME_PUBLIC_SHARED_MAX_AGE', 60 * 60 * 24))
+RESUME_SHARE_MISS_TIMEOUT = int(os.getenv('RESUME_SHARE_MISS_TIMEOUT', 60))
+RESUME_PURGE_HANDLER = os.getenv('RESUME_PURGE_HANDLER', '')
+
+# Rendered HTML/PDF resumes are stored in MEDIA_ROOT. Requests wait up to
+# RESUME_RENDER_WAIT seconds for a missing render before answering 202.
+RESUME_RENDER_WORKERS = int(os.getenv('RESUME_RENDER_WORKERS', 2))
+RESUME_RENDER_WAIT = float(os.getenv('RESUME_RENDER_WAIT', 0))
+# Render on the run_tasks workers instead of a thread pool inside the web process.
+RESUME_RENDER_QUEUE = os.getenv('RESUME_RENDER_QUEUE', '').lower() in ('1', 'true', 'yes')
+# TrueType fonts for PDFs, which otherwise use Helvetica and only cover Latin-1.
+RESUME_PDF_FONT = os.getenv('RESUME_PDF_FONT', '')
+RESUME_PDF_BOLD_FONT = os.getenv('RESUME_PDF_BOLD_FONT', '')
+
+# Background tasks: failed attempts are retried after TASK_RETRY_DELAY seconds,
+# doubling each time; running tasks not finished within TASK_LOCK_TIMEOUT
+# seconds are assumed lost with their worker and queued again.
+TASK_RETRY_DELAY = int(os.getenv('TASK_RETRY_DELAY', 10))
+TASK_LOCK_TIMEOUT = int(os.getenv('TASK_LOCK_TIMEOUT', 60 * 10))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
+# New passwords are hashed with the profile's hasher; the others stay listed so
+# existing hashes keep verifying and are upgraded on the next login. Measure the
+# cost parameters on the production hardware with `manage.py benchmark_hashers`.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': 'accounts.hashers.TunedPBKDF2PasswordHasher',
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'scrypt': 'accounts.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 260000))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 102400))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 8))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv('PASSWORD_SCRYPT_PARALLELISM', 1))
+
+# Password hashes run on a pool of this many threads; requests queue for a slot
+# for at most PASSWORD_HASHING_TIMEOUT seconds before getting a 503.
+PASSWORD_HASHING_WORKERS = int(os.getenv('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1))
+PASSWORD_HASHING_QUEUE = int(os.getenv('PASSWORD_HASHING_QUEUE', 64))
+PASSWORD_HASHING_TIMEOUT = float(os.getenv('PASSWORD_HASHING_TIMEOUT', 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -118,6 +213,11 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.getenv('STATIC_ROOT', BASE_DIR / 'staticfiles')
+STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -126,15 +226,53 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
+# Trust the signed user_id claim instead of loading the user on every request.
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', '').lower() in ('1', 'true', 'yes')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.StatelessJWTAuthentication' if JWT_STATELESS_AUTH
+        else 'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema'
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'utils.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
+    'DEFAULT_PAGINATION_CLASS': 'resumes.api.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+    # Sliding-window limits for the credential endpoints, counted in the default cache.
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '30/min'),
+        'login_username': os.getenv('THROTTLE_LOGIN_USERNAME', '5/min'),
+        'register_ip': os.getenv('THROTTLE_REGISTER_IP', '10/hour'),
+    },
+    # The number of proxies in front of the app, to find the client IP in X-Forwarded-For.
+    # With none, the header is ignored, as any client can send it.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# HS256 signs with SECRET_KEY unless JWT_SIGNING_KEY is set. RS* and ES* algorithms need
+# `cryptography` and the PEM files of a key pair; compare their cost with `manage.py benchmark_jwt`.
+JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+if JWT_ALGORITHM.startswith('HS'):
+    JWT_SIGNING_KEY, JWT_VERIFYING_KEY = os.getenv('JWT_SIGNING_KEY', SECRET_KEY), ''
+else:
+    with open(os.environ['JWT_SIGNING_KEY_FILE']) as f:
+        JWT_SIGNING_KEY = f.read()
+    with open(os.environ['JWT_VERIFYING_KEY_FILE']) as f:
+        JWT_VERIFYING_KEY = f.read()
+
 SIMPLE_JWT = {
+    "ALGORITHM": JWT_ALGORITHM,
+    "SIGNING_KEY": JWT_SIGNING_KEY,
+    "VERIFYING_KEY": JWT_VERIFYING_KEY,
     "ACCESS_TOKEN_LIFETIME": datetime.timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": datetime.timedelta(days=1),
 
@@ -146,13 +284,14 @@ SIMPLE_JWT = {
 
     "TOKEN_TYPE_CLAIM": "token_type",
     "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
+    "AUTH_TOKEN_CLASSES": ("accounts.tokens.AccessToken",),
 
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
     "SLIDING_TOKEN_LIFETIME": datetime.timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": datetime.timedelta(days=1),
 
-    "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.api.serializers.TokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.api.serializers.TokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
     "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
@@ -1,12 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include, re_path
 
-from accounts.api.views import RegistrationAPIView, LoginAPIView
+from accounts.api.views import RegistrationAPIView, LoginAPIView, ThrottledTokenObtainPairView
+from utils.views import metrics_view
 
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
@@ -29,9 +27,10 @@ urlpatterns = [
     # core ⭕
     path('admin/', admin.site.urls),
     path('api/resume/', include('resumes.api.urls')),
+    path('api/tasks/', include('tasks.api.urls')),
 
     # Authentication 🔑
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/register/', RegistrationAPIView.as_view(), name='register'),
     path('api/login/', LoginAPIView.as_view(), name='login'),
@@ -41,4 +40,7 @@ urlpatterns = [
     path('doc/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
+    # Monitoring 📈
+    path('metrics', metrics_view, name='metrics'),
+
 ]
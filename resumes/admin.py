@@ -1,8 +1,10 @@
 from django.contrib import admin
-from .models import Skill, Education, Certificate, Experience, Bio
+from .models import Skill, Education, Certificate, Experience, Bio, ResumeSnapshot, ResumeShare
 
 admin.site.register(Skill)
 admin.site.register(Education)
 admin.site.register(Certificate)
 admin.site.register(Experience)
 admin.site.register(Bio)
+admin.site.register(ResumeSnapshot)
+admin.site.register(ResumeShare)
@@ -0,0 +1,75 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from resumes.cache import get_version
+from resumes.documents import SECTION_SERIALIZERS
+from resumes.services import get_resume_document
+from utils.renderers import FastJSONRenderer
+
+
+def authenticate(request):
+    """
+    Run the configured DRF authenticators and return the user, or None.
+    """
+    request = Request(request)
+    for authenticator_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authenticator_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+def get_user_and_version(request):
+    # Authenticators may query the database, and the deny-list and the version
+    # live in a cache; neither may block the event loop, so both share a thread hop.
+    user = authenticate(request)
+    return user, get_version(user.pk) if user is not None else None
+
+
+async def get_resume_response(request, get_payload):
+    # Django 3.2's require_GET cannot wrap coroutines.
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    try:
+        user, version = await sync_to_async(get_user_and_version)(request)
+    except exceptions.APIException as e:
+        return JsonResponse({'detail': str(e.detail)}, status=e.status_code)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    etag = '"%s"' % hashlib.sha1(f'{request.get_full_path()}|{version}'.encode()).hexdigest()
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        document = await sync_to_async(get_resume_document)(user.pk)
+        response = HttpResponse(FastJSONRenderer().render(get_payload(document)), content_type='application/json')
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+async def resume_view(request):
+    """
+    ⚡ Async view to read the resume of the authenticated user under ASGI.
+
+    The ETag comes from the per-user resume version alone, so a 304 needs no
+    database work at all; otherwise the document is loaded in a second thread
+    hop from the cache or the snapshot table. Django 3.2 has no async cache
+    API, so the authentication and version lookups run in a thread as well.
+    Async class-based views need Django 4.1, hence functions.
+    """
+    return await get_resume_response(request, lambda document: document)
+
+
+async def section_list_view(request, section):
+    """
+    ⚡ Async view to list one section of the authenticated user's resume, unpaginated.
+    """
+    if section not in SECTION_SERIALIZERS:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    return await get_resume_response(request, lambda document: document[section])
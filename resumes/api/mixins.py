@@ -0,0 +1,239 @@
+import hashlib
+
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from resumes.api.fastpath import get_field_plan
+from resumes.cache import get_version
+from resumes.signals import SECTION_NAMES, delete_rows, resume_changed
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET requests with 304 Not Modified when the client's copy is current.
+
+    Validators come from a cheap probe of the resource (latest
+    ``modified_time`` and row count) combined with the per-user resume
+    version, which is bumped on every save and delete. The version catches
+    deletions that MAX(modified_time) alone would miss, which is also why no
+    ``Last-Modified`` is sent: If-Modified-Since would answer 304 after them.
+    """
+
+    def get_conditional_queryset(self):
+        return self.get_queryset()
+
+    def get_resource_state(self):
+        """
+        Return ``(last_modified, fingerprint)`` for the requested resource.
+        """
+        state = self.get_conditional_queryset().order_by().aggregate(
+            last_modified=Max('modified_time'),
+            count=Count('pk'),
+        )
+        return state['last_modified'], state['count']
+
+    def get_etag(self, request, last_modified, fingerprint):
+        parts = [
+            request.get_full_path(),
+            # The browsable API and JSON representations are different entities.
+            request.accepted_media_type,
+            get_version(request.user.pk),
+            last_modified.isoformat() if last_modified else '',
+            fingerprint,
+        ]
+        return '"%s"' % hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        last_modified, fingerprint = self.get_resource_state()
+        etag = self.get_etag(request, last_modified, fingerprint)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class FieldPlanListMixin:
+    """
+    Serve list GETs from ``.values()`` rows rendered by the serializer's field
+    plan instead of instantiating a model and a serializer per row.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = get_field_plan(self.get_serializer_class())
+        rows = plan.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
+
+
+class ConditionalDetailMixin(ConditionalGetMixin):
+    """
+    Conditional GETs for ``<pk>`` detail views, probing only the requested row.
+    """
+
+    def get_conditional_queryset(self):
+        return self.get_queryset().filter(pk=self.kwargs[self.lookup_field])
+
+
+class BulkModelMixin:
+    """
+    Batch create, update and delete on a section list endpoint.
+
+    An array POSTed to the endpoint is inserted with one ``bulk_create``, a
+    PATCH with an array of objects carrying ``id`` is applied with one
+    ``bulk_update`` and a DELETE with an array of ids removes the rows, each
+    inside a single transaction. Any invalid item rejects the whole batch
+    unless ``?partial=true`` is passed, in which case the valid items are
+    written and the response reports errors item by item.
+    """
+
+    bulk_max_items = 500
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def patch(self, request, *args, **kwargs):
+        return self.bulk_update(request)
+
+    def delete(self, request, *args, **kwargs):
+        return self.bulk_destroy(request)
+
+    def is_partial_batch(self):
+        return self.request.query_params.get('partial', '').lower() in ('1', 'true', 'yes')
+
+    def get_batch(self, request):
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if len(request.data) > self.bulk_max_items:
+            message = f'Ensure there are no more than {self.bulk_max_items} items.'
+            raise ValidationError({'non_field_errors': [message]})
+        return request.data
+
+    def get_valid_indexes(self, errors):
+        if any(errors) and not self.is_partial_batch():
+            raise ValidationError([error or {} for error in errors])
+        return [index for index, error in enumerate(errors) if not error]
+
+    def get_batch_ids(self, items):
+        return [item.get('id') if isinstance(item, dict) else item for item in items]
+
+    def is_valid_id(self, pk):
+        # Not isinstance: JSON true and false are bools, which are ints too.
+        return type(pk) is int
+
+    def get_id_error(self, pk, existing):
+        if not self.is_valid_id(pk):
+            return {'id': ['Invalid.']}
+        if pk not in existing:
+            return {'id': ['Not found.']}
+        return None
+
+    def bulk_create(self, request):
+        items = self.get_batch(request)
+        serializers = [self.get_serializer(data=item) for item in items]
+        errors = [None if serializer.is_valid() else serializer.errors for serializer in serializers]
+        valid = self.get_valid_indexes(errors)
+
+        model = self.get_queryset().model
+        objs = [model(user_id=request.user.pk, **serializers[index].validated_data) for index in valid]
+        with transaction.atomic():
+            self.perform_bulk_create(objs)
+
+        results = [None] * len(items)
+        for index, obj in zip(valid, objs):
+            results[index] = self.get_serializer(obj).data
+        return self.get_batch_response(results, errors, status.HTTP_201_CREATED)
+
+    def perform_bulk_create(self, objs):
+        if not objs:
+            return
+        if connection.features.can_return_rows_from_bulk_insert:
+            objs[0].__class__.objects.bulk_create(objs)
+            resume_changed(self.request.user.pk, SECTION_NAMES[objs[0].__class__])
+        else:
+            # Without RETURNING the new primary keys would be unknown, so
+            # fall back to one INSERT per row inside the same transaction.
+            for obj in objs:
+                obj.save()
+
+    def bulk_update(self, request):
+        items = self.get_batch(request)
+        ids = self.get_batch_ids(items)
+        instances = self.get_queryset().in_bulk([pk for pk in ids if self.is_valid_id(pk)])
+
+        serializers, errors = [], []
+        for item, pk in zip(items, ids):
+            error = self.get_id_error(pk, instances)
+            if error:
+                serializers.append(None)
+                errors.append(error)
+                continue
+            serializer = self.get_serializer(instances[pk], data=item, partial=True)
+            serializers.append(serializer)
+            errors.append(None if serializer.is_valid() else serializer.errors)
+        valid = self.get_valid_indexes(errors)
+
+        objs, fields = [], {'modified_time'}
+        now = timezone.now()
+        for index in valid:
+            instance = serializers[index].instance
+            for attr, value in serializers[index].validated_data.items():
+                setattr(instance, attr, value)
+                fields.add(attr)
+            instance.modified_time = now
+            objs.append(instance)
+        with transaction.atomic():
+            self.perform_bulk_update(objs, sorted(fields))
+
+        results = [None] * len(items)
+        for index in valid:
+            results[index] = self.get_serializer(serializers[index].instance).data
+        return self.get_batch_response(results, errors, status.HTTP_200_OK)
+
+    def perform_bulk_update(self, objs, fields):
+        if objs:
+            objs[0].__class__.objects.bulk_update(objs, fields)
+            resume_changed(self.request.user.pk, SECTION_NAMES[objs[0].__class__])
+
+    def bulk_destroy(self, request):
+        items = self.get_batch(request)
+        ids = self.get_batch_ids(items)
+        existing = set(self.get_queryset().filter(
+            pk__in=[pk for pk in ids if self.is_valid_id(pk)]).values_list('pk', flat=True))
+        errors = [self.get_id_error(pk, existing) for pk in ids]
+        valid = self.get_valid_indexes(errors)
+
+        with transaction.atomic():
+            self.perform_bulk_destroy(self.get_queryset().filter(pk__in=[ids[index] for index in valid]))
+
+        if self.is_partial_batch():
+            return self.get_batch_response([None] * len(items), errors, status.HTTP_204_NO_CONTENT)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_bulk_destroy(self, queryset):
+        if delete_rows(queryset):
+            resume_changed(self.request.user.pk, SECTION_NAMES[queryset.model])
+
+    def get_batch_response(self, results, errors, success_status):
+        if not self.is_partial_batch():
+            return Response(results, status=success_status)
+        if not any(errors) and success_status == status.HTTP_204_NO_CONTENT:
+            return Response(status=success_status)
+        return Response(
+            {'results': results, 'errors': errors},
+            status=status.HTTP_207_MULTI_STATUS if any(errors) else success_status,
+        )
@@ -1,11 +1,22 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db.models import Value
+from django.db.models.functions import Lower
+from django.urls import reverse
 from rest_framework import serializers
 
-from resumes.models import Skill, Education, Certificate, Experience, Bio
+from resumes.models import Skill, Education, Certificate, Experience, Bio, ResumeShare
 
 User = get_user_model()
 
 
+def email_is_taken(email, exclude_user_id=None):
+    return User.objects.alias(email_lower=Lower('email')).filter(
+        email_lower=Lower(Value(email))).exclude(pk=exclude_user_id).exists()
+
+
 class SkillSerializer(serializers.ModelSerializer):
     class Meta:
         model = Skill
@@ -52,3 +63,109 @@ class ResumeSerializer(serializers.ModelSerializer):
         model = User
         fields = ['first_name', 'last_name', 'email', 'phone_number', 'skills', 'educations', 'certificates',
                   'experiences', 'bio']
+
+
+class ResumeShareSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResumeShare
+        fields = ['slug', 'is_public', 'url']
+        read_only_fields = ['slug']
+
+    def get_url(self, obj):
+        url = reverse('resumes:resume-public', kwargs={'slug': obj.slug})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class SkillItemSerializer(SkillSerializer):
+    id = serializers.IntegerField(required=False)
+
+
+class EducationItemSerializer(EducationSerializer):
+    id = serializers.IntegerField(required=False)
+
+
+class CertificateItemSerializer(CertificateSerializer):
+    id = serializers.IntegerField(required=False)
+
+
+class ExperienceItemSerializer(ExperienceSerializer):
+    id = serializers.IntegerField(required=False)
+
+
+class ResumeWriteSerializer(serializers.ModelSerializer):
+    """
+    Validates a whole resume document sent back by the client.
+
+    Section items keep their ``id`` so the stored rows can be diffed against
+    the document; items without one are new.
+    """
+    skills = SkillItemSerializer(many=True)
+    educations = EducationItemSerializer(many=True)
+    certificates = CertificateItemSerializer(many=True)
+    experiences = ExperienceItemSerializer(many=True)
+    bio = BioSerializer(allow_null=True)
+
+    class Meta:
+        model = User
+        fields = ['first_name', 'last_name', 'email', 'phone_number', 'skills', 'educations', 'certificates',
+                  'experiences', 'bio']
+
+    def validate_email(self, value):
+        # Case-insensitive, like the unique index on LOWER(email).
+        if value and email_is_taken(value, exclude_user_id=self.context['request'].user.pk):
+            raise serializers.ValidationError('Email address is already in use.')
+        return value
+
+    def validate(self, attrs):
+        for section in ('skills', 'educations', 'certificates', 'experiences'):
+            ids = [item['id'] for item in attrs[section] if 'id' in item]
+            if len(ids) != len(set(ids)):
+                raise serializers.ValidationError({section: ['Each item may appear only once.']})
+        return attrs
+
+
+class ResumeImportSerializer(serializers.ModelSerializer):
+    """
+    Validates one imported user with their resume without touching the database.
+
+    Username and email uniqueness are left to the importer, which checks a
+    whole batch in one query; the sections' model ``clean()`` rules run here.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    password = serializers.CharField(max_length=128, min_length=8, required=False, write_only=True)
+    skills = SkillSerializer(many=True, required=False)
+    educations = EducationSerializer(many=True, required=False)
+    certificates = CertificateSerializer(many=True, required=False)
+    experiences = ExperienceSerializer(many=True, required=False)
+    bio = BioSerializer(allow_null=True, required=False)
+
+    section_models = {
+        'skills': Skill,
+        'educations': Education,
+        'certificates': Certificate,
+        'experiences': Experience,
+    }
+
+    class Meta:
+        model = User
+        fields = ['username', 'password', 'first_name', 'last_name', 'email', 'phone_number', 'skills',
+                  'educations', 'certificates', 'experiences', 'bio']
+
+    def validate(self, attrs):
+        if 'password' in attrs:
+            user = User(**{field: attrs.get(field, '') for field in ('username', 'first_name', 'last_name', 'email')})
+            try:
+                validate_password(attrs['password'], user)
+            except ValidationError as e:
+                raise serializers.ValidationError({'password': e.messages})
+
+        for section, model in self.section_models.items():
+            for item in attrs.get(section, []):
+                try:
+                    model(**item).clean()
+                except ValidationError as e:
+                    raise serializers.ValidationError({section: e.messages})
+        return attrs
@@ -1,5 +1,6 @@
 from django.urls import path
 
+from .async_views import resume_view, section_list_view
 from .views import (
     SkillListCreateAPIView,
     SkillRetrieveUpdateDestroyAPIView,
@@ -11,12 +12,22 @@ from .views import (
     ExperienceRetrieveUpdateDestroyAPIView,
     BioCreateRetrieveUpdateDestroyAPIView,
     ResumeAPIView,
+    ResumeShareAPIView,
+    PublicResumeAPIView,
+    ResumeExportAPIView,
+    ResumeRenderAPIView,
 )
 
 app_name = 'resumes'
 
 urlpatterns = [
     path('', ResumeAPIView.as_view(), name='resume-retrieve'),
+    path('share', ResumeShareAPIView.as_view(), name='resume-share'),
+    path('public/<slug:slug>', PublicResumeAPIView.as_view(), name='resume-public'),
+    path('export', ResumeExportAPIView.as_view(), name='resume-export'),
+    path('render/<str:fmt>', ResumeRenderAPIView.as_view(), name='resume-render'),
+    path('async', resume_view, name='resume-async'),
+    path('async/<str:section>', section_list_view, name='resume-async-section'),
 
     path('skills', SkillListCreateAPIView.as_view(), name='skills-list-create'),
     path('skill/<int:pk>', SkillRetrieveUpdateDestroyAPIView.as_view(), name='skill-retrieve-update-destroy'),
@@ -1,24 +1,56 @@
-from django.contrib.auth import get_user_model
-from rest_framework import generics
-from rest_framework.permissions import IsAuthenticated
+import hashlib
+import logging
+from concurrent import futures
 
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import generics, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from resumes.api.mixins import BulkModelMixin, ConditionalGetMixin, ConditionalDetailMixin, FieldPlanListMixin
 from resumes.api.permissions import IsOwner
-from resumes.models import Skill, Education, Certificate, Experience, Bio
+from resumes.cache import get_version
+from resumes.exports import iter_resume_lines
+from resumes import rendering
+from resumes.models import Skill, Education, Certificate, Experience, Bio, ResumeShare, make_share_slug
+from resumes.services import (
+    get_resume_document,
+    get_public_resume_document,
+    get_resume_state,
+    apply_resume_document,
+)
 from resumes.api.serializers import (
     SkillSerializer,
     EducationSerializer,
     CertificateSerializer,
     ExperienceSerializer,
     BioSerializer,
-    ResumeSerializer
+    ResumeSerializer,
+    ResumeWriteSerializer,
+    ResumeShareSerializer,
+    email_is_taken,
 )
+from resumes.sharing import get_shared_user_id, get_surrogate_key
+from tasks.services import enqueue
+from utils.renderers import FastJSONRenderer
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
-class SkillListCreateAPIView(generics.ListCreateAPIView):
+class SkillListCreateAPIView(BulkModelMixin, ConditionalGetMixin, FieldPlanListMixin,
+                             generics.ListCreateAPIView):
     """
-    💪 API view to list and create skill instances.
+    💪 API view to list and create skill instances, one at a time or in batches.
     """
 
     queryset = Skill.objects.all()
@@ -26,13 +58,13 @@ class SkillListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, ]
 
     def get_queryset(self):
-        return self.queryset.select_related('user').filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.pk)
 
     def perform_create(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class SkillRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class SkillRetrieveUpdateDestroyAPIView(ConditionalDetailMixin, generics.RetrieveUpdateDestroyAPIView):
     """
       💪 API view to retrieve, update, and delete a skill instance.
     """
@@ -41,26 +73,30 @@ class SkillRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = SkillSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
+
     def perform_update(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class EducationListCreateAPIView(generics.ListCreateAPIView):
+class EducationListCreateAPIView(BulkModelMixin, ConditionalGetMixin, FieldPlanListMixin,
+                                 generics.ListCreateAPIView):
     """
-    🎓 API view to list and create education instances.
+    🎓 API view to list and create education instances, one at a time or in batches.
     """
     queryset = Education.objects.all()
     serializer_class = EducationSerializer
     permission_classes = [IsAuthenticated, ]
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.pk)
 
     def perform_create(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class EducationRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class EducationRetrieveUpdateDestroyAPIView(ConditionalDetailMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     🎓 API view to retrieve, update, and delete an education instance.
     """
@@ -68,26 +104,30 @@ class EducationRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIVie
     serializer_class = EducationSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
+
     def perform_update(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class CertificatesListCreateAPIView(generics.ListCreateAPIView):
+class CertificatesListCreateAPIView(BulkModelMixin, ConditionalGetMixin, FieldPlanListMixin,
+                                    generics.ListCreateAPIView):
     """
-    📜 API view to list and create certificate instances.
+    📜 API view to list and create certificate instances, one at a time or in batches.
     """
     queryset = Certificate.objects.all()
     serializer_class = CertificateSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
     def get_queryset(self):
-        return self.queryset.select_related('user').filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.pk)
 
     def perform_create(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class CertificateRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CertificateRetrieveUpdateDestroyAPIView(ConditionalDetailMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     📜 API view to retrieve, update, and delete a certificate instance.
     """
@@ -95,26 +135,30 @@ class CertificateRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIV
     serializer_class = CertificateSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
+
     def perform_update(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class ExperienceListCreateAPIView(generics.ListCreateAPIView):
+class ExperienceListCreateAPIView(BulkModelMixin, ConditionalGetMixin, FieldPlanListMixin,
+                                  generics.ListCreateAPIView):
     """
-     🏢 API view to list and create experience instances.
+     🏢 API view to list and create experience instances, one at a time or in batches.
      """
     queryset = Experience.objects.all()
     serializer_class = ExperienceSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
     def get_queryset(self):
-        return self.queryset.select_related('user').filter(user=self.request.user)
+        return self.queryset.filter(user_id=self.request.user.pk)
 
     def perform_create(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class ExperienceRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ExperienceRetrieveUpdateDestroyAPIView(ConditionalDetailMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     🏢 API view to retrieve, update, and delete an experience instance.
     """
@@ -122,12 +166,16 @@ class ExperienceRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIVi
     serializer_class = ExperienceSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
+
     def perform_update(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class BioCreateRetrieveUpdateDestroyAPIView(generics.CreateAPIView, generics.RetrieveUpdateDestroyAPIView,
-                                            generics.UpdateAPIView, generics.DestroyAPIView):
+class BioCreateRetrieveUpdateDestroyAPIView(ConditionalGetMixin, generics.CreateAPIView,
+                                            generics.RetrieveUpdateDestroyAPIView, generics.UpdateAPIView,
+                                            generics.DestroyAPIView):
     """
     📝 API view to create, retrieve, update, and delete a bio instance.
     """
@@ -135,22 +183,156 @@ class BioCreateRetrieveUpdateDestroyAPIView(generics.CreateAPIView, generics.Ret
     serializer_class = BioSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
+    def get_conditional_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
+
     def get_object(self):
-        return self.queryset.filter(user=self.request.user).first()
+        return self.queryset.filter(user_id=self.request.user.pk).first()
 
     def perform_create(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
     def perform_update(self, serializer):
-        return serializer.save(user=self.request.user)
+        return serializer.save(user_id=self.request.user.pk)
 
 
-class ResumeAPIView(generics.RetrieveAPIView):
+class ResumeAPIView(ConditionalGetMixin, generics.RetrieveAPIView):
     """
-    📄 API view to retrieve the resume instance of the authenticated user.
+    📄 API view to retrieve the resume of the authenticated user, or replace it as a whole.
     """
     serializer_class = ResumeSerializer
     permission_classes = [IsAuthenticated, ]
 
+    def get_resource_state(self):
+        return get_resume_state(self.request.user.pk)
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(get_resume_document(request.user.pk))
+
+    def put(self, request, *args, **kwargs):
+        serializer = ResumeWriteSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        try:
+            apply_resume_document(request.user.pk, serializer.validated_data)
+        except IntegrityError:
+            # Another user took the email after validation; the transaction was rolled back.
+            email = serializer.validated_data.get('email')
+            if not email or not email_is_taken(email, exclude_user_id=request.user.pk):
+                raise
+            raise ValidationError({'email': ['Email address is already in use.']})
+        return Response(get_resume_document(request.user.pk))
+
+
+class ResumeShareAPIView(generics.RetrieveUpdateDestroyAPIView):
+    """
+    🔗 API view to publish the resume of the authenticated user under a public link.
+
+    POST creates the link, or replaces its slug so that the old link stops working.
+    """
+    serializer_class = ResumeShareSerializer
+    permission_classes = [IsAuthenticated, ]
+
     def get_object(self):
-        return self.request.user
+        return get_object_or_404(ResumeShare, user_id=self.request.user.pk)
+
+    def post(self, request, *args, **kwargs):
+        share = ResumeShare.objects.filter(user_id=request.user.pk).first()
+        serializer = self.get_serializer(share, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user_id=request.user.pk, slug=make_share_slug())
+        return Response(serializer.data, status=status.HTTP_201_CREATED if share is None else status.HTTP_200_OK)
+
+
+class PublicResumeAPIView(APIView):
+    """
+    🌐 API view to read a published resume without authentication.
+
+    Responses are public and tagged with a ``Surrogate-Key`` per user, so a
+    reverse proxy can serve them until the owner's next edit purges the key.
+    A warm cache answers without touching the database. Contact details and
+    user ids are left out, and JSON is the only format, as the ETag and the
+    proxies' copies do not vary on ``Accept``.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny, ]
+    renderer_classes = [FastJSONRenderer, ]
+
+    def get(self, request, slug):
+        user_id = get_shared_user_id(slug)
+        if user_id is None:
+            raise NotFound()
+
+        etag = '"%s"' % hashlib.sha1(f'{slug}|{get_version(user_id)}'.encode()).hexdigest()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(get_public_resume_document(user_id))
+
+        response['ETag'] = etag
+        response['Surrogate-Key'] = get_surrogate_key(user_id)
+        patch_cache_control(response, public=True, max_age=settings.RESUME_PUBLIC_MAX_AGE,
+                            s_maxage=settings.RESUME_PUBLIC_SHARED_MAX_AGE)
+        return response
+
+
+class ResumeExportAPIView(APIView):
+    """
+    📦 API view to stream the resumes of all users as NDJSON, for admins only.
+    """
+    permission_classes = [IsAdminUser, ]
+
+    def get(self, request):
+        response = StreamingHttpResponse(iter_resume_lines(), content_type='application/x-ndjson')
+        response['Content-Disposition'] = 'attachment; filename="resumes.ndjson"'
+        return response
+
+
+class ResumeRenderAPIView(APIView):
+    """
+    🖨️ API view to download the resume of the authenticated user as HTML or PDF.
+
+    Renders are stored under the hash of the resume content, so an unchanged
+    resume is served from storage. A missing render is queued on the worker
+    pool, or as a background task with ``RESUME_RENDER_QUEUE``, and answered
+    with 202 Accepted until it is ready, or with 503 if rendering failed.
+    """
+    permission_classes = [IsAuthenticated, ]
+
+    def get(self, request, fmt):
+        if not rendering.is_available(fmt):
+            raise NotFound()
+
+        document = get_resume_document(request.user.pk)
+        key = rendering.get_artifact_key(document)
+        etag = f'"{key}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            response['ETag'] = etag
+            return response
+
+        name = rendering.get_artifact_name(request.user.pk, key, fmt)
+        if not default_storage.exists(name) and settings.RESUME_RENDER_QUEUE:
+            task = enqueue('resumes.render', {'user_id': request.user.pk, 'fmt': fmt}, user_id=request.user.pk,
+                           dedupe_key=f'render-{fmt}')
+            location = reverse('tasks:task-retrieve', kwargs={'pk': task.pk})
+            return Response({'status': 'rendering', 'task': request.build_absolute_uri(location)},
+                            status=status.HTTP_202_ACCEPTED, headers={'Retry-After': '1', 'Location': location})
+        if not default_storage.exists(name):
+            future = rendering.submit_render(document, fmt, name)
+            try:
+                future.result(timeout=settings.RESUME_RENDER_WAIT)
+            except futures.TimeoutError:
+                return Response({'status': 'rendering'}, status=status.HTTP_202_ACCEPTED, headers={'Retry-After': '1'})
+            except Exception:
+                logger.exception('Could not render the resume of user %s as %s', request.user.pk, fmt)
+                return Response({'status': 'failed'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        try:
+            file = default_storage.open(name)
+        except FileNotFoundError:
+            # A render of a newer version of the resume replaced this one meanwhile.
+            return Response({'status': 'rendering'}, status=status.HTTP_202_ACCEPTED, headers={'Retry-After': '1'})
+        response = FileResponse(file, as_attachment=fmt == 'pdf', filename=f'resume.{fmt}')
+        response['Content-Type'] = rendering.CONTENT_TYPES[fmt]
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
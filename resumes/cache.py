@@ -0,0 +1,83 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'resume:version:{user_id}'
+DOCUMENT_KEY = 'resume:document:{user_id}:{version}'
+
+
+class CacheStats:
+    """
+    Process-local hit/miss counters for the resume document cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[settings.RESUME_CACHE_ALIAS]
+
+
+def get_version(user_id):
+    """
+    Return the current resume version of a user.
+
+    A missing counter is seeded with the current time rather than zero, so a
+    counter that was evicted can never hand out a version whose document is
+    still lingering in the cache.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+
+
+def get_or_build_document(user_id, build):
+    """
+    Return the cached resume document of a user, calling ``build`` on a miss.
+    """
+    cache = get_cache()
+    key = DOCUMENT_KEY.format(user_id=user_id, version=get_version(user_id))
+    document = cache.get(key)
+    stats.record(document is not None)
+    if document is None:
+        document = build()
+        cache.set(key, document, timeout=settings.RESUME_CACHE_TIMEOUT)
+    return document
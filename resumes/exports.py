@@ -0,0 +1,39 @@
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+
+from resumes.documents import build_resume_documents
+from utils.renderers import FastJSONRenderer
+
+User = get_user_model()
+
+
+def iter_user_id_chunks(chunk_size):
+    """
+    Yield lists of user ids in primary-key order.
+
+    The ids stream from a single server-side cursor where the database
+    supports one, so the full list is never held in memory.
+    """
+    user_ids = User.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(user_ids, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_resume_lines(chunk_size=1000):
+    """
+    Yield the resumes of all users as NDJSON, one ``bytes`` block per chunk.
+
+    Each line is the resume document led by the user's ``id``. A chunk costs
+    the few set-based queries of ``build_resume_documents``.
+    """
+    renderer = FastJSONRenderer()
+    for chunk in iter_user_id_chunks(chunk_size):
+        documents = build_resume_documents(chunk)
+        yield b''.join(
+            renderer.render({'id': user_id, **documents[user_id]}) + b'\n'
+            for user_id in chunk if user_id in documents
+        )
@@ -0,0 +1,100 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from resumes.api.serializers import ResumeImportSerializer
+from resumes.documents import SECTION_MODELS
+
+User = get_user_model()
+
+USER_FIELDS = ('username', 'password', 'first_name', 'last_name', 'email', 'phone_number')
+LIST_SECTIONS = ('skills', 'educations', 'certificates', 'experiences')
+
+
+def prepare_batch(batch):
+    """
+    Parse, validate and hash one batch of ``(line_number, line)`` pairs.
+
+    Runs in a worker process, so it never touches the database. Returns
+    ``(rows, errors)`` where each row is ``(line_number, validated_data)``
+    with the password already hashed, and each error is
+    ``(line_number, messages)``.
+    """
+    rows, errors = [], []
+    for line_number, line in batch:
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            errors.append((line_number, {'non_field_errors': [str(e)]}))
+            continue
+
+        serializer = ResumeImportSerializer(data=data)
+        if not serializer.is_valid():
+            errors.append((line_number, serializer.errors))
+            continue
+
+        row = serializer.validated_data
+        # Users imported without a password have to reset it before logging in.
+        row['password'] = make_password(row.get('password'))
+        rows.append((line_number, row))
+    return rows, errors
+
+
+def find_taken(rows):
+    """
+    Return the rows whose username or email is already used, by the database
+    or by an earlier row of the same batch, as ``(line_number, messages)``.
+    """
+    # Compared without case, like the unique indexes on both columns.
+    usernames = [row['username'].lower() for _, row in rows]
+    emails = [row['email'].lower() for _, row in rows if row.get('email')]
+    taken_usernames, taken_emails = set(), set()
+    users = User.objects.alias(username_lower=Lower('username'), email_lower=Lower('email'))
+    for username, email in users.filter(Q(username_lower__in=usernames) | Q(email_lower__in=emails)).values_list(
+            'username', 'email'):
+        taken_usernames.add(username.lower())
+        taken_emails.add(email.lower())
+
+    taken = {}
+    for line_number, row in rows:
+        username, email = row['username'].lower(), row.get('email', '').lower()
+        if username in taken_usernames:
+            taken[line_number] = {'username': ['Username is already taken.']}
+        elif email and email in taken_emails:
+            taken[line_number] = {'email': ['Email address is already in use.']}
+        taken_usernames.add(username)
+        if email:
+            taken_emails.add(email)
+    return taken
+
+
+@transaction.atomic
+def write_batch(rows):
+    """
+    Insert validated rows with one ``bulk_create`` per table.
+
+    Returns the errors of the rows that were skipped because their username
+    or email is taken. ``bulk_create`` sends no signals, which suits new users
+    with nothing cached yet.
+    """
+    taken = find_taken(rows)
+    rows = [row for line_number, row in rows if line_number not in taken]
+
+    User.objects.bulk_create(User(**{field: row.get(field, '') for field in USER_FIELDS}) for row in rows)
+    # Not every backend returns the primary keys of bulk inserts.
+    user_ids = dict(User.objects.filter(username__in=[row['username'] for row in rows]).values_list('username', 'pk'))
+
+    for section in LIST_SECTIONS:
+        SECTION_MODELS[section].objects.bulk_create(
+            SECTION_MODELS[section](user_id=user_ids[row['username']], **item)
+            for row in rows for item in row.get(section, [])
+        )
+    SECTION_MODELS['bio'].objects.bulk_create(
+        SECTION_MODELS['bio'](user_id=user_ids[row['username']], **row['bio'])
+        for row in rows if row.get('bio')
+    )
+    return list(taken.items())
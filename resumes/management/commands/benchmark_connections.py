@@ -0,0 +1,54 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import Client
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Measure /api/resume/ latency with per-request and persistent database connections. '
+            'Point DB_HOST/DB_PORT at PgBouncer to measure it instead of PostgreSQL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--conn-max-age', type=int, nargs='+', default=[0, 60])
+        parser.add_argument('--health-checks', choices=('on', 'off', 'both'), default='both')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(username='benchmark-connections', defaults={'password': '!'})
+        token = RefreshToken.for_user(user).access_token
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_HOST='localhost')
+        url = reverse('resumes:resume-retrieve')
+        health_checks = {'on': [True], 'off': [False], 'both': [False, True]}[options['health_checks']]
+
+        settings_dict = connections['default'].settings_dict
+        original = settings_dict['CONN_MAX_AGE'], settings_dict.get('CONN_HEALTH_CHECKS')
+        try:
+            for max_age in options['conn_max_age']:
+                for checks in health_checks:
+                    settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = max_age, checks
+                    connections.close_all()
+                    latencies = self.measure(client, url, options['requests'])
+                    quantiles = statistics.quantiles(latencies, n=100)
+                    self.stdout.write(f'CONN_MAX_AGE={max_age} health checks {"on" if checks else "off"}: '
+                                      f'p50 {quantiles[49] * 1000:.2f}ms, p99 {quantiles[98] * 1000:.2f}ms')
+        finally:
+            settings_dict['CONN_MAX_AGE'], settings_dict['CONN_HEALTH_CHECKS'] = original
+            user.delete()
+
+    def measure(self, client, url, requests):
+        latencies = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+            # The test client skips the request_finished handler that applies CONN_MAX_AGE.
+            close_old_connections()
+        return latencies
@@ -0,0 +1,122 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from resumes.api.pagination import KeysetCursorPagination
+from resumes.models import Skill, Education, Certificate, Experience
+from resumes.services import get_resume_state
+
+User = get_user_model()
+
+SECTION_MODELS = (Skill, Education, Certificate, Experience)
+USERNAME_PREFIX = 'bench-'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a benchmark dataset and compare resume query plans and latency with and without the '
+        'section indexes. Indexes are dropped inside a transaction that is rolled back, which holds '
+        'exclusive locks on the section tables: never run this against a live database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--rows', type=int, default=50, help='Rows per section for every seeded user.')
+        parser.add_argument('--samples', type=int, default=200, help='Number of users sampled per query.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--skip-seed', action='store_true', help='Reuse a previously seeded dataset.')
+
+    def handle(self, *args, **options):
+        if not options['skip_seed']:
+            self.seed(options['users'], options['rows'], options['batch_size'])
+
+        user_ids = list(User.objects.filter(username__startswith=USERNAME_PREFIX).values_list('pk', flat=True))
+        if not user_ids:
+            self.stderr.write('No seeded users found.')
+            return
+        sample = random.sample(user_ids, min(options['samples'], len(user_ids)))
+
+        try:
+            with transaction.atomic():
+                self.drop_indexes()
+                self.report('without indexes', sample)
+                raise Rollback
+        except Rollback:
+            pass
+        self.report('with indexes', sample)
+
+    def seed(self, users, rows, batch_size):
+        start = time.perf_counter()
+        first = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+        User.objects.bulk_create(
+            (User(username=f'{USERNAME_PREFIX}{first + i}', password='!') for i in range(users)),
+            batch_size=batch_size,
+        )
+        user_ids = User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('-pk').values_list(
+            'pk', flat=True)[:users]
+
+        today = date.today()
+        for user_id in user_ids:
+            days = [timedelta(days=random.randint(0, 7000)) for _ in range(rows)]
+            Skill.objects.bulk_create(
+                (Skill(user_id=user_id, title=f'Skill {random.randint(0, 500)}', rate=random.randint(1, 5))
+                 for _ in range(rows)), batch_size=batch_size)
+            Education.objects.bulk_create(
+                (Education(user_id=user_id, institution='University', degree='Bachelor', start_date=today - day)
+                 for day in days), batch_size=batch_size)
+            Certificate.objects.bulk_create(
+                (Certificate(user_id=user_id, issuing_authority='Authority', issue_date=today - day)
+                 for day in days), batch_size=batch_size)
+            Experience.objects.bulk_create(
+                (Experience(user_id=user_id, company='Company', position='Position', start_date=today - day,
+                            description='Description') for day in days), batch_size=batch_size)
+
+        self.stdout.write(f'Seeded {users} users with {users * rows * len(SECTION_MODELS)} section rows '
+                          f'in {time.perf_counter() - start:.1f}s')
+
+    def drop_indexes(self):
+        schema_editor = connection.schema_editor(atomic=False)
+        for model in SECTION_MODELS:
+            for index in model._meta.indexes:
+                schema_editor.execute(index.remove_sql(model, schema_editor))
+
+    def queries(self, user_id):
+        paginator = KeysetCursorPagination()
+        for model in SECTION_MODELS:
+            queryset = model.objects.filter(user_id=user_id)
+            ordering = paginator.get_ordering(None, queryset, None)
+            yield f'{model.__name__} first page', queryset.order_by(*ordering)[:paginator.page_size]
+        yield 'Resume state probe', None
+
+    def report(self, label, sample):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label} =='))
+        timings = {}
+        for user_id in sample:
+            for name, queryset in self.queries(user_id):
+                start = time.perf_counter()
+                if queryset is None:
+                    get_resume_state(user_id)
+                else:
+                    list(queryset)
+                timings.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+
+        for name, queryset in self.queries(sample[0]):
+            values = sorted(timings[name])
+            p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+            self.stdout.write(f'{name}: p50 {statistics.median(values):.3f}ms p99 {p99:.3f}ms')
+            if queryset is not None:
+                self.stdout.write(self.explain(queryset))
+
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
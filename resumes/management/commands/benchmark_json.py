@@ -0,0 +1,71 @@
+import io
+import timeit
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from utils.parsers import FastJSONParser
+from utils.renderers import FastJSONRenderer
+
+
+def make_resume(rows):
+    """
+    Build a payload shaped like ``ResumeSerializer`` output with ``rows`` items per section.
+    """
+    today = date.today()
+    return {
+        'first_name': 'Jane',
+        'last_name': 'Doe',
+        'email': 'jane@example.com',
+        'phone_number': '989121234567',
+        'skills': [{'id': i, 'user': 1, 'title': f'Skill {i}', 'rate': i % 5 + 1} for i in range(rows)],
+        'educations': [
+            {'id': i, 'user': 1, 'institution': 'University of Tehran', 'degree': 'Bachelor',
+             'start_date': (today - timedelta(days=i * 365)).isoformat(), 'end_date': None}
+            for i in range(rows)
+        ],
+        'certificates': [
+            {'id': i, 'user': 1, 'issuing_authority': 'Authority', 'issue_date': today.isoformat()}
+            for i in range(rows)
+        ],
+        'experiences': [
+            {'id': i, 'user': 1, 'company': 'Company', 'position': 'Backend developer',
+             'start_date': today.isoformat(), 'end_date': today.isoformat(), 'description': 'Built things. ' * 20}
+            for i in range(rows)
+        ],
+        'bio': {'id': 1, 'user': 1, 'content': 'Developer from Tehran. ' * 10},
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare the stdlib and orjson-backed JSON renderer and parser on resume payloads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[5, 50, 500],
+                            help='Items per resume section.')
+        parser.add_argument('--number', type=int, default=0,
+                            help='Iterations per measurement; picked automatically when omitted.')
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            payload = make_resume(rows)
+            body = JSONRenderer().render(payload)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {rows} rows per section, {len(body)} bytes =='))
+
+            cases = [
+                ('render', JSONRenderer(), FastJSONRenderer(), lambda renderer: renderer.render(payload)),
+                ('parse', JSONParser(), FastJSONParser(), lambda parser: parser.parse(io.BytesIO(body))),
+            ]
+            for name, stdlib, fast, run in cases:
+                baseline = self.measure(lambda: run(stdlib), options['number'])
+                optimized = self.measure(lambda: run(fast), options['number'])
+                self.stdout.write(f'{name}: stdlib {baseline * 1e6:.1f}us, fast {optimized * 1e6:.1f}us, '
+                                  f'{baseline / optimized:.1f}x')
+
+    def measure(self, func, number):
+        timer = timeit.Timer(func)
+        if not number:
+            number, _ = timer.autorange()
+        return min(timer.repeat(repeat=5, number=number)) / number
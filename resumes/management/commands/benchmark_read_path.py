@@ -0,0 +1,55 @@
+import timeit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from resumes.api.fastpath import get_field_plan
+from resumes.api.serializers import SkillSerializer, ExperienceSerializer
+from resumes.models import Skill, Experience
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-row cost of the serializer and field-plan read paths for section lists.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['rows'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, sizes, repeat):
+        user = User.objects.create(username='benchmark-read-path', password='!')
+        for rows in sizes:
+            Skill.objects.filter(user=user).delete()
+            Experience.objects.filter(user=user).delete()
+            Skill.objects.bulk_create(Skill(user=user, title=f'Skill {i}', rate=i % 5 + 1) for i in range(rows))
+            Experience.objects.bulk_create(
+                Experience(user=user, company=f'Company {i}', position='Position', start_date='2020-01-01',
+                           end_date='2021-01-01', description='Description') for i in range(rows))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {rows} rows =='))
+            for model, serializer_class in ((Skill, SkillSerializer), (Experience, ExperienceSerializer)):
+                queryset = model.objects.filter(user=user)
+                plan = get_field_plan(serializer_class)
+                serializer = self.measure(lambda: serializer_class(queryset.all(), many=True).data, repeat)
+                fast = self.measure(lambda: plan.render(plan.values(queryset.all())), repeat)
+                self.stdout.write(f'{model.__name__}: serializer {serializer / rows * 1e6:.2f}us/row, '
+                                  f'field plan {fast / rows * 1e6:.2f}us/row, {serializer / fast:.1f}x')
+
+    def measure(self, func, repeat):
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        return min(timer.repeat(repeat=repeat, number=number)) / number
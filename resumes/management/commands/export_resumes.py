@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes.exports import iter_resume_lines
+
+
+class Command(BaseCommand):
+    help = 'Write the resumes of all users as JSON lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='File to write to, "-" for standard output.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        lines = 0
+        if options['output'] == '-':
+            for block in iter_resume_lines(options['chunk_size']):
+                self.stdout.write(block.decode(), ending='')
+                lines += block.count(b'\n')
+        else:
+            with open(options['output'], 'wb') as output:
+                for block in iter_resume_lines(options['chunk_size']):
+                    output.write(block)
+                    lines += block.count(b'\n')
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(f'Exported {lines} resumes in {elapsed:.1f}s.')
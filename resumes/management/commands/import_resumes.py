@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from resumes.imports import prepare_batch, write_batch
+
+
+class Command(BaseCommand):
+    help = 'Import users with their resumes from a JSON lines file, resuming from the last checkpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Processes validating and hashing batches; 1 runs them inline.')
+        parser.add_argument('--checkpoint', help='Progress file, "<path>.checkpoint" by default.')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        checkpoint = options['checkpoint'] or f"{options['path']}.checkpoint"
+        done = 0 if options['restart'] else self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f'Resuming after line {done}.')
+
+        started = time.perf_counter()
+        imported = rejected = 0
+        with open(options['path'], encoding='utf-8') as lines:
+            batches = self.batches(lines, done, options['batch_size'])
+            for (rows, errors), last_line in self.prepare(batches, options['workers']):
+                taken = write_batch(rows)
+                # Written only once the batch has committed, so a crash repeats at most the batch in flight.
+                self.write_checkpoint(checkpoint, last_line)
+
+                imported += len(rows) - len(taken)
+                rejected += len(errors) + len(taken)
+                for line_number, messages in sorted(errors + taken):
+                    self.stderr.write(f'line {line_number}: {json.dumps(messages)}')
+                self.report(imported, rejected, started)
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} users, rejected {rejected}, {imported / elapsed:.0f} rows/s.'))
+
+    def batches(self, lines, done, batch_size):
+        numbered = ((number, line) for number, line in enumerate(lines, start=1) if number > done and line.strip())
+        while True:
+            batch = list(islice(numbered, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def prepare(self, batches, workers):
+        """
+        Yield ``(prepare_batch(batch), last_line)`` in file order.
+
+        With several workers a bounded window of batches is in flight, so the
+        file is read no faster than the database can take the rows.
+        """
+        if workers <= 1:
+            for batch in batches:
+                yield prepare_batch(batch), batch[-1][0]
+            return
+
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append((executor.submit(prepare_batch, batch), batch[-1][0]))
+                if len(pending) >= workers * 2:
+                    future, last_line = pending.popleft()
+                    yield future.result(), last_line
+            while pending:
+                future, last_line = pending.popleft()
+                yield future.result(), last_line
+
+    def report(self, imported, rejected, started):
+        if self.verbosity > 1:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{imported} imported, {rejected} rejected, {imported / elapsed:.0f} rows/s')
+
+    def read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            return json.load(f)['line']
+
+    def write_checkpoint(self, path, line):
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump({'line': line}, f)
+        os.replace(f'{path}.tmp', path)
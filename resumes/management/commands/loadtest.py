@@ -0,0 +1,78 @@
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the throughput and latency of an endpoint of a running server, e.g. the sync '
+        '/api/resume/ under gunicorn against the async /api/resume/async under uvicorn.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per URL.')
+        parser.add_argument('--token', help='Access token sent as a Bearer authorization header.')
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        for url in options['urls']:
+            self.run(url, headers, options['concurrency'], options['requests'])
+
+    def run(self, url, headers, concurrency, total):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise CommandError(f'Not an HTTP URL: {url}')
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        path = parts.path + (f'?{parts.query}' if parts.query else '')
+
+        remaining = iter(range(total))
+        lock = threading.Lock()
+        latencies, errors = [], []
+
+        def client():
+            # One keep-alive connection per client, like a browser or a proxy.
+            connection = connection_class(parts.netloc, timeout=30)
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        break
+                started = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    error = f'HTTP {response.status}' if response.status >= 400 else None
+                except (OSError, http.client.HTTPException) as e:
+                    connection.close()
+                    error = repr(e)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    if error:
+                        errors.append(error)
+                    else:
+                        latencies.append(elapsed)
+            connection.close()
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {url} =='))
+        self.stdout.write(f'{len(latencies)} ok, {len(errors)} failed in {elapsed:.1f}s: '
+                          f'{len(latencies) / elapsed:.0f} req/s at concurrency {concurrency}')
+        if len(latencies) > 1:
+            quantiles = statistics.quantiles(latencies, n=100)
+            self.stdout.write(f'latency p50 {quantiles[49] * 1000:.1f}ms, p95 {quantiles[94] * 1000:.1f}ms, '
+                              f'p99 {quantiles[98] * 1000:.1f}ms')
+        if errors:
+            self.stdout.write(f'first error: {errors[0]}')
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from resumes.snapshots import find_inconsistent_snapshots, rebuild_snapshots
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the resume snapshots of all users in parallel batches, or check them for staleness.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--check', action='store_true', help='Only report inconsistent snapshots.')
+        parser.add_argument('--fix', action='store_true', help='With --check, rebuild the inconsistent snapshots.')
+
+    def handle(self, *args, **options):
+        task = self.check_batch if options['check'] else self.rebuild_batch
+        fix = options['fix']
+        batches = self.batches(options['batch_size'])
+        total = problems = 0
+        for count, found in self.run(lambda batch: task(batch, fix), batches, options['workers']):
+            total += count
+            problems += len(found)
+            for user_id, reason in sorted(found.items()):
+                self.stdout.write(f'user {user_id}: {reason}')
+
+        if options['check']:
+            self.stdout.write(f'Checked {total} snapshots, {problems} inconsistent.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} snapshots.'))
+
+    def run(self, task, batches, workers):
+        if workers <= 1:
+            yield from map(task, batches)
+            return
+
+        def threaded(batch):
+            try:
+                return task(batch)
+            finally:
+                # Each worker thread holds its own connection.
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(threaded, batches)
+
+    def batches(self, batch_size):
+        """Yield user id batches in primary-key order without an OFFSET scan."""
+        last_id = 0
+        while True:
+            batch = list(User.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]
+
+    def rebuild_batch(self, user_ids, fix):
+        return len(rebuild_snapshots(user_ids)), {}
+
+    def check_batch(self, user_ids, fix):
+        problems = find_inconsistent_snapshots(user_ids)
+        if fix and problems:
+            rebuild_snapshots(list(problems))
+        return len(user_ids), problems
@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2026-10-18 19:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('resumes', '0006_user_modified_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeSnapshot',
+            fields=[
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('modified_time', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resume_snapshot', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+                ('document', models.TextField(verbose_name='document')),
+                ('checksum', models.CharField(max_length=40, verbose_name='checksum')),
+                ('stale', models.BooleanField(default=False, verbose_name='stale')),
+            ],
+            options={
+                'verbose_name': 'Resume snapshot',
+                'verbose_name_plural': 'Resume snapshots',
+                'db_table': 'resume_snapshot',
+            },
+        ),
+    ]
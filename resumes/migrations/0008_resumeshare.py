@@ -0,0 +1,32 @@
+# Generated by Django 3.2 on 2026-10-18 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import resumes.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('resumes', '0007_resumesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeShare',
+            fields=[
+                ('created_time', models.DateTimeField(auto_now_add=True)),
+                ('modified_time', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resume_share', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='user')),
+                ('slug', models.CharField(default=resumes.models.make_share_slug, max_length=32, unique=True, verbose_name='slug')),
+                ('is_public', models.BooleanField(default=True, verbose_name='is public')),
+            ],
+            options={
+                'verbose_name': 'Resume share',
+                'verbose_name_plural': 'Resume shares',
+                'db_table': 'resume_share',
+            },
+        ),
+    ]
@@ -1,3 +1,5 @@
+import secrets
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -20,6 +22,10 @@ class Skill(BaseModel):
         verbose_name_plural = _('Skills')
         db_table = 'skill'
         ordering = ('title',)
+        indexes = [
+            models.Index(fields=['user', 'title', 'id'], name='skill_user_title_idx'),
+            models.Index(fields=['user', 'modified_time'], name='skill_user_modified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.title}"
@@ -37,6 +43,10 @@ class Education(BaseModel):
         verbose_name_plural = _('Educations')
         db_table = 'education'
         ordering = ('start_date',)
+        indexes = [
+            models.Index(fields=['user', 'start_date', 'id'], name='education_user_start_idx'),
+            models.Index(fields=['user', 'modified_time'], name='education_user_modified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.institution} > {self.start_date} - {self.end_date}"
@@ -59,6 +69,10 @@ class Certificate(BaseModel):
         verbose_name_plural = _('certificates')
         db_table = 'certificate'
         ordering = ('-issue_date',)
+        indexes = [
+            models.Index(fields=['user', '-issue_date', '-id'], name='certificate_user_issue_idx'),
+            models.Index(fields=['user', 'modified_time'], name='certificate_user_modified_idx'),
+        ]
 
 
 class Experience(BaseModel):
@@ -74,6 +88,10 @@ class Experience(BaseModel):
         verbose_name_plural = _('Experiences')
         db_table = 'experience'
         ordering = ('-start_date',)
+        indexes = [
+            models.Index(fields=['user', '-start_date', '-id'], name='experience_user_start_idx'),
+            models.Index(fields=['user', 'modified_time'], name='experience_user_modified_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.company}"
@@ -93,3 +111,49 @@ class Bio(BaseModel):
     class Meta:
         verbose_name = _('Bio')
         db_table = 'bio'
+
+
+class ResumeSnapshot(BaseModel):
+    """
+    The rendered resume document of a user, kept up to date as sections change.
+
+    ``document`` holds the JSON exactly as the API renders it; ``stale`` is set
+    inside every writing transaction and cleared once the snapshot has been
+    refreshed after commit.
+    """
+    user = models.OneToOneField(User, verbose_name=_('user'), primary_key=True, related_name='resume_snapshot',
+                                on_delete=models.CASCADE)
+    document = models.TextField(verbose_name=_('document'))
+    checksum = models.CharField(max_length=40, verbose_name=_('checksum'))
+    stale = models.BooleanField(default=False, verbose_name=_('stale'))
+
+    class Meta:
+        verbose_name = _('Resume snapshot')
+        verbose_name_plural = _('Resume snapshots')
+        db_table = 'resume_snapshot'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.checksum}"
+
+
+def make_share_slug():
+    return secrets.token_urlsafe(16)
+
+
+class ResumeShare(BaseModel):
+    """
+    The public link of a user's resume. ``slug`` is unguessable, so the link
+    is only known to whoever the owner hands it to.
+    """
+    user = models.OneToOneField(User, verbose_name=_('user'), primary_key=True, related_name='resume_share',
+                                on_delete=models.CASCADE)
+    slug = models.CharField(max_length=32, unique=True, default=make_share_slug, verbose_name=_('slug'))
+    is_public = models.BooleanField(default=True, verbose_name=_('is public'))
+
+    class Meta:
+        verbose_name = _('Resume share')
+        verbose_name_plural = _('Resume shares')
+        db_table = 'resume_share'
+
+    def __str__(self):
+        return f"{self.user_id} - {self.slug}"
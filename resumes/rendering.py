@@ -0,0 +1,215 @@
+import os
+import posixpath
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import get_template
+
+from resumes.snapshots import dumps, get_checksum
+
+try:
+    from fpdf import FPDF
+except ImportError:
+    FPDF = None
+
+# Bump whenever the template or the PDF layout changes, so that artifacts
+# rendered by the previous version are no longer served.
+RENDER_VERSION = 2
+
+CONTENT_TYPES = {
+    'html': 'text/html; charset=utf-8',
+    'pdf': 'application/pdf',
+}
+
+
+def is_available(fmt):
+    return fmt == 'html' or (fmt == 'pdf' and FPDF is not None)
+
+
+def format_dates(start, end):
+    return f"{start} - {end or 'present'}"
+
+
+def get_render_context(document):
+    """
+    Flatten a resume document into the headings and entries both formats lay out.
+    """
+    name = ' '.join(filter(None, (document['first_name'], document['last_name'])))
+    sections = [
+        ('Experience', [
+            {'heading': item['position'], 'subheading': item['company'],
+             'dates': format_dates(item['start_date'], item['end_date']), 'body': item['description']}
+            for item in document['experiences']
+        ]),
+        ('Education', [
+            {'heading': item['institution'], 'subheading': item['degree'],
+             'dates': format_dates(item['start_date'], item['end_date'])}
+            for item in document['educations']
+        ]),
+        ('Certificates', [
+            {'heading': item['issuing_authority'], 'dates': item['issue_date']}
+            for item in document['certificates']
+        ]),
+        ('Skills', [
+            {'heading': item['title'], 'subheading': f"{item['rate']}/5"}
+            for item in document['skills']
+        ]),
+    ]
+    return {
+        'name': name,
+        'contact': [value for value in (document['email'], document['phone_number']) if value],
+        'summary': document['bio']['content'] if document['bio'] else '',
+        'sections': [{'title': title, 'entries': entries} for title, entries in sections if entries],
+    }
+
+
+@lru_cache(maxsize=None)
+def get_resume_template():
+    """The resume template, parsed once per process."""
+    return get_template('resumes/resume.html')
+
+
+def render_html(document):
+    return get_resume_template().render(get_render_context(document)).encode()
+
+
+def latin1(text):
+    # The core PDF fonts only cover Latin-1.
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+def add_fonts(pdf):
+    """
+    Register the fonts of ``pdf`` and return their family along with the
+    function preparing text for them.
+
+    ``RESUME_PDF_FONT`` embeds a TrueType font, which covers scripts the core
+    Helvetica font cannot, with ``RESUME_PDF_BOLD_FONT`` as its bold face.
+    """
+    if not settings.RESUME_PDF_FONT:
+        return 'helvetica', latin1
+    pdf.add_font('resume', '', settings.RESUME_PDF_FONT)
+    pdf.add_font('resume', 'B', settings.RESUME_PDF_BOLD_FONT or settings.RESUME_PDF_FONT)
+    return 'resume', str
+
+
+def render_pdf(document):
+    if FPDF is None:
+        raise ImproperlyConfigured('Rendering resumes as PDF requires the fpdf2 package.')
+
+    context = get_render_context(document)
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    family, text = add_fonts(pdf)
+
+    pdf.set_font(family, 'B', 20)
+    pdf.cell(0, 10, text(context['name']), new_x='LMARGIN', new_y='NEXT')
+    pdf.set_font(family, '', 10)
+    if context['contact']:
+        pdf.cell(0, 6, text(' | '.join(context['contact'])), new_x='LMARGIN', new_y='NEXT')
+    if context['summary']:
+        pdf.ln(2)
+        pdf.multi_cell(0, 5, text(context['summary']), new_x='LMARGIN', new_y='NEXT')
+
+    for section in context['sections']:
+        pdf.ln(4)
+        pdf.set_font(family, 'B', 14)
+        pdf.cell(0, 8, text(section['title']), border='B', new_x='LMARGIN', new_y='NEXT')
+        for entry in section['entries']:
+            pdf.ln(1)
+            pdf.set_font(family, 'B', 11)
+            pdf.cell(0, 6, text(entry['heading']), new_x='LMARGIN', new_y='NEXT')
+            pdf.set_font(family, '', 10)
+            meta = ' | '.join(filter(None, (entry.get('subheading'), entry.get('dates'))))
+            if meta:
+                pdf.cell(0, 5, text(meta), new_x='LMARGIN', new_y='NEXT')
+            if entry.get('body'):
+                pdf.multi_cell(0, 5, text(entry['body']), new_x='LMARGIN', new_y='NEXT')
+    return bytes(pdf.output())
+
+
+RENDERERS = {
+    'html': render_html,
+    'pdf': render_pdf,
+}
+
+
+def get_artifact_key(document):
+    """Hash identifying a rendering of exactly this resume content."""
+    return get_checksum(f'{RENDER_VERSION}|{dumps(document)}')
+
+
+def get_artifact_name(user_id, key, fmt):
+    return f'resume-renders/{user_id}/{key}.{fmt}'
+
+
+def store_artifact(name, content):
+    """
+    Store ``content`` under ``name`` in one step, so that no request serves a
+    partly written file.
+
+    Local files are written under a temporary name and then renamed; remote
+    storages such as S3 store an object in a single request anyway.
+    """
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        default_storage.save(name, ContentFile(content))
+        return
+    temp = default_storage.save(f'{name}.{uuid.uuid4().hex}.tmp', ContentFile(content))
+    os.replace(default_storage.path(temp), path)
+
+
+def delete_superseded(name):
+    """Delete the renders of the same user and format stored before ``name``."""
+    directory, filename = posixpath.split(name)
+    extension = posixpath.splitext(filename)[1]
+    for other in default_storage.listdir(directory)[1]:
+        if other != filename and other.endswith(extension):
+            default_storage.delete(posixpath.join(directory, other))
+
+
+def render_artifact(document, fmt, name):
+    """Render ``document`` and store it under ``name`` unless it is already stored."""
+    if not default_storage.exists(name):
+        store_artifact(name, RENDERERS[fmt](document))
+        delete_superseded(name)
+    return name
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.RESUME_RENDER_WORKERS,
+                                           thread_name_prefix='resume-render')
+        return _executor
+
+
+def submit_render(document, fmt, name):
+    """
+    Render an artifact on the worker pool and return its future.
+
+    Requests for an artifact that is already being rendered share the
+    running future instead of rendering it twice.
+    """
+    with _pending_lock:
+        future = _pending.get(name)
+        if future is None:
+            future = get_executor().submit(render_artifact, document, fmt, name)
+            _pending[name] = future
+            future.add_done_callback(lambda done: _pending.pop(name, None))
+    return future
@@ -0,0 +1,147 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.utils import timezone
+
+from resumes import cache
+from resumes.documents import (
+    RESUME_SECTIONS,
+    RESUME_USER_FIELDS,
+    SECTION_MODELS,
+    build_public_document,
+)
+from resumes.models import Bio
+from resumes.signals import delete_rows, resume_changed
+from resumes.snapshots import get_snapshot_document
+
+User = get_user_model()
+
+
+def get_resume_queryset():
+    """
+    Users with every resume section loaded up front.
+
+    The bio is joined in the main query and each list section is fetched with
+    one prefetch query, so a resume always costs the same number of queries
+    however many rows its sections hold.
+    """
+    return User.objects.select_related('bio').prefetch_related(*RESUME_SECTIONS)
+
+
+def get_resume_document(user_id):
+    """
+    Return the serialized resume of a user.
+
+    Reads go to the versioned cache first and then to the user's snapshot,
+    which is rebuilt from the section tables only when missing or stale.
+    """
+    return cache.get_or_build_document(user_id, lambda: get_snapshot_document(user_id))
+
+
+def get_public_resume_document(user_id):
+    """
+    Return the resume of a user as a public link shows it.
+    """
+    return build_public_document(get_resume_document(user_id))
+
+
+def get_resume_state(user_id):
+    """
+    Probe the latest ``modified_time`` and row count of every resume section.
+
+    Returns ``(last_modified, counts)`` computed with a single query, where
+    ``counts`` is a tuple with one entry per section.
+    """
+    annotations = {}
+    for name, model in SECTION_MODELS.items():
+        rows = model.objects.filter(user_id=OuterRef('pk')).order_by().values('user_id')
+        annotations[f'{name}_modified'] = Subquery(rows.annotate(value=Max('modified_time')).values('value'))
+        annotations[f'{name}_count'] = Subquery(rows.annotate(value=Count('pk')).values('value'))
+
+    state = next(iter(User.objects.filter(pk=user_id).values(**annotations)), {})
+    modified = [state.get(f'{name}_modified') for name in SECTION_MODELS]
+    modified = [value for value in modified if value is not None]
+    counts = tuple(state.get(f'{name}_count') or 0 for name in SECTION_MODELS)
+    return max(modified, default=None), counts
+
+
+def apply_resume_document(user_id, document):
+    """
+    Bring the stored resume of a user in line with a validated document.
+
+    Every section is diffed against the stored rows: items without a known
+    ``id`` are inserted, changed items are updated and missing rows are
+    deleted, with at most one statement per kind and section. Rows that did
+    not change keep their ``modified_time``. Returns whether anything was
+    written.
+    """
+    with transaction.atomic():
+        # Lock the user row so concurrent replacements of one resume serialize.
+        user = get_resume_queryset().select_for_update(of=('self',)).get(pk=user_id)
+        changed = False
+
+        user_fields = [field for field in RESUME_USER_FIELDS
+                       if field in document and getattr(user, field) != document[field]]
+        if user_fields:
+            for field in user_fields:
+                setattr(user, field, document[field])
+            user.save(update_fields=user_fields)
+            changed = True
+
+        for section in RESUME_SECTIONS:
+            rows = getattr(user, section).all()
+            changed |= sync_section(user_id, SECTION_MODELS[section], rows, document[section])
+
+        changed |= sync_bio(user, document['bio'])
+
+        if changed:
+            resume_changed(user_id)
+        return changed
+
+
+def sync_section(user_id, model, rows, items):
+    existing = {row.pk: row for row in rows}
+    now = timezone.now()
+    created, updated, fields, kept = [], [], {'modified_time'}, set()
+
+    for item in items:
+        values = dict(item)
+        row = existing.get(values.pop('id', None))
+        if row is None:
+            created.append(model(user_id=user_id, **values))
+            continue
+        kept.add(row.pk)
+        dirty = [field for field, value in values.items() if getattr(row, field) != value]
+        if dirty:
+            for field in dirty:
+                setattr(row, field, values[field])
+            row.modified_time = now
+            updated.append(row)
+            fields.update(dirty)
+
+    deleted = existing.keys() - kept
+    if deleted:
+        delete_rows(model.objects.filter(pk__in=deleted))
+    if created:
+        model.objects.bulk_create(created)
+    if updated:
+        model.objects.bulk_update(updated, sorted(fields))
+    return bool(created or updated or deleted)
+
+
+def sync_bio(user, values):
+    bio = getattr(user, 'bio', None)
+    if values is None:
+        if bio is None:
+            return False
+        bio.delete()
+        return True
+    if bio is None:
+        Bio.objects.create(user_id=user.pk, **values)
+        return True
+    if all(getattr(bio, field) == value for field, value in values.items()):
+        return False
+    for field, value in values.items():
+        setattr(bio, field, value)
+    bio.save()
+    return True
@@ -0,0 +1,67 @@
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from resumes.cache import get_cache
+from resumes.models import ResumeShare
+
+logger = logging.getLogger(__name__)
+
+SHARE_KEY = 'resume:share:{slug}'
+NOT_SHARED = 0
+
+
+def get_surrogate_key(user_id):
+    return f'resume-{user_id}'
+
+
+def get_shared_user_id(slug):
+    """
+    Return the id of the user publishing their resume under ``slug``, or None.
+
+    Both outcomes are cached, so repeated hits on a public link, or on a
+    made-up one, do not reach the database. A slug longer than any stored one
+    is rejected before it can make an oversized cache key.
+    """
+    if len(slug) > ResumeShare._meta.get_field('slug').max_length:
+        return None
+    cache = get_cache()
+    key = SHARE_KEY.format(slug=slug)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = ResumeShare.objects.filter(slug=slug, is_public=True).values_list('user_id', flat=True).first()
+        user_id = user_id or NOT_SHARED
+        cache.set(key, user_id, timeout=settings.RESUME_CACHE_TIMEOUT if user_id else settings.RESUME_SHARE_MISS_TIMEOUT)
+    return user_id or None
+
+
+def forget_share(*slugs):
+    get_cache().delete_many([SHARE_KEY.format(slug=slug) for slug in slugs if slug])
+
+
+@lru_cache(maxsize=None)
+def get_purge_handler():
+    path = settings.RESUME_PURGE_HANDLER
+    return import_string(path) if path else None
+
+
+def purge_resume(user_id, check_shared=True):
+    """
+    Ask the configured reverse proxy to drop its copies of a public resume.
+
+    ``RESUME_PURGE_HANDLER`` is called with the list of surrogate keys to
+    purge. Users without a public link are skipped unless ``check_shared`` is
+    off, which is the case when the link itself just changed.
+    """
+    handler = get_purge_handler()
+    if handler is None:
+        return
+    if check_shared and not ResumeShare.objects.filter(pk=user_id, is_public=True).exists():
+        return
+    try:
+        handler([get_surrogate_key(user_id)])
+    except Exception:
+        # Proxies still drop the copy once its s-maxage runs out.
+        logger.exception('Could not purge the public resume of user %s', user_id)
@@ -0,0 +1,133 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from resumes.cache import bump_version
+from resumes.documents import RESUME_USER_FIELDS
+from resumes.models import Skill, Education, Certificate, Experience, Bio, ResumeShare
+from resumes.sharing import forget_share, purge_resume
+from resumes.snapshots import mark_stale, refresh_snapshot_quietly
+
+User = get_user_model()
+
+SECTION_NAMES = {
+    Skill: 'skills',
+    Education: 'educations',
+    Certificate: 'certificates',
+    Experience: 'experiences',
+    Bio: 'bio',
+}
+
+
+class CommitBatch:
+    """
+    The resume changes made through one connection up to its next commit.
+    """
+
+    def __init__(self):
+        # Users whose snapshot was fresh before this transaction marked it stale.
+        self.marked = set()
+        self.refreshed = set()
+
+
+_batches = threading.local()
+
+
+def get_batch():
+    batch = getattr(_batches, 'current', None)
+    if batch is None:
+        batch = _batches.current = CommitBatch()
+    return batch
+
+
+def resume_changed(user_id, section=None):
+    """
+    Invalidate everything derived from the resume of ``user_id``.
+
+    The version is bumped and the snapshot flagged stale right away, inside
+    the writing transaction. Once it commits the snapshot is refreshed
+    (``section`` narrows the refresh to one part of the document) and the
+    version bumped again, so a reader that rebuilt the document from
+    not-yet-committed state cannot leave a stale copy behind. Proxies caching
+    the public link are purged last.
+
+    Every change registers its own commit hook, so that hooks discarded by a
+    rollback take nothing else with them; the hooks of one commit then run
+    a single refresh per user and section.
+    """
+    bump_version(user_id)
+    batch = get_batch()
+    if mark_stale(user_id):
+        batch.marked.add(user_id)
+
+    def committed():
+        if getattr(_batches, 'current', None) is batch:
+            # Changes made from now on belong to the next commit.
+            _batches.current = CommitBatch()
+        # A snapshot that was already stale may be missing an earlier change, such
+        # as one whose refresh failed, anywhere in the document.
+        key = (user_id, section if user_id in batch.marked else None)
+        if key in batch.refreshed or (user_id, None) in batch.refreshed:
+            return
+        batch.refreshed.add(key)
+        refresh_snapshot_quietly(user_id, key[1])
+        bump_version(user_id)
+        purge_resume(user_id)
+
+    transaction.on_commit(committed)
+
+
+def delete_rows(queryset):
+    """
+    Delete section rows in one statement, without loading them or signalling
+    each one; the caller invalidates the resume once afterwards.
+
+    Section rows have no dependents, so there is nothing to cascade.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Saves such as the last_login update on every login leave the resume alone.
+    if update_fields and not set(update_fields) & set(RESUME_USER_FIELDS):
+        return
+    if created:
+        # There is no snapshot yet; the first read builds it.
+        bump_version(instance.pk)
+        return
+    resume_changed(instance.pk, section='user')
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_version(instance.pk)
+
+
+@receiver(pre_save, sender=ResumeShare)
+def share_saving(sender, instance, **kwargs):
+    instance.previous_slug = ResumeShare.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=ResumeShare)
+@receiver(post_delete, sender=ResumeShare)
+def share_changed(sender, instance, **kwargs):
+    slugs = (getattr(instance, 'previous_slug', None), instance.slug)
+
+    def committed():
+        forget_share(*slugs)
+        purge_resume(instance.user_id, check_shared=False)
+
+    transaction.on_commit(committed)
+
+
+def section_changed(sender, instance, **kwargs):
+    resume_changed(instance.user_id, section=SECTION_NAMES[sender])
+
+
+for model in SECTION_NAMES:
+    post_save.connect(section_changed, sender=model, dispatch_uid=f'resume_section_saved_{model.__name__}')
+    post_delete.connect(section_changed, sender=model, dispatch_uid=f'resume_section_deleted_{model.__name__}')
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from resumes.documents import build_resume_document, build_resume_documents, build_resume_section
+from resumes.models import ResumeSnapshot
+from utils.parsers import loads
+from utils.renderers import FastJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def dumps(document):
+    return FastJSONRenderer().render(document).decode()
+
+
+def get_checksum(content):
+    return hashlib.sha1(content.encode()).hexdigest()
+
+
+def make_snapshot(user_id, document):
+    content = dumps(document)
+    return ResumeSnapshot(user_id=user_id, document=content, checksum=get_checksum(content))
+
+
+def save_snapshots(documents):
+    """
+    Replace the snapshots of ``{user_id: document}`` in one transaction.
+    """
+    with transaction.atomic():
+        ResumeSnapshot.objects.filter(pk__in=documents).delete()
+        ResumeSnapshot.objects.bulk_create(make_snapshot(user_id, document) for user_id, document in documents.items())
+
+
+def rebuild_snapshots(user_ids):
+    """
+    Rebuild the snapshots of ``user_ids`` from the section tables.
+
+    The existing rows are locked before the documents are built, so a writer
+    changing one of these resumes meanwhile waits for this transaction and
+    its own refresh lands after it rather than under it.
+    """
+    with transaction.atomic():
+        list(ResumeSnapshot.objects.select_for_update().filter(pk__in=user_ids).order_by('pk').values_list('pk'))
+        documents = build_resume_documents(user_ids)
+        save_snapshots(documents)
+    return documents
+
+
+def get_snapshot_document(user_id):
+    """
+    Return the resume document of a user from their snapshot.
+
+    A missing or stale snapshot is rebuilt from the section tables and
+    stored on the way out, unless a writer changed it in the meantime: the
+    document built here may predate that writer's commit, and its own
+    refresh has the newer one.
+    """
+    snapshot = ResumeSnapshot.objects.filter(pk=user_id).values_list('stale', 'modified_time', 'document').first()
+    if snapshot is not None and not snapshot[0]:
+        return loads(snapshot[2])
+
+    document = build_resume_document(user_id)
+    content = dumps(document)
+    if snapshot is None:
+        try:
+            with transaction.atomic():
+                ResumeSnapshot.objects.create(user_id=user_id, document=content, checksum=get_checksum(content))
+        except IntegrityError:
+            # A writer or a concurrent read stored the snapshot first.
+            pass
+    else:
+        # Every mark_stale() moves modified_time, so this only replaces the row that was read.
+        ResumeSnapshot.objects.filter(pk=user_id, stale=True, modified_time=snapshot[1]).update(
+            document=content, checksum=get_checksum(content), stale=False, modified_time=timezone.now())
+    return document
+
+
+def mark_stale(user_id):
+    """
+    Flag the snapshot of a user as stale and return whether it was fresh.
+
+    ``modified_time`` moves either way, so that a read rebuilding the
+    snapshot from older data cannot store it over this change.
+    """
+    now = timezone.now()
+    if ResumeSnapshot.objects.filter(pk=user_id, stale=False).update(stale=True, modified_time=now):
+        return True
+    ResumeSnapshot.objects.filter(pk=user_id).update(modified_time=now)
+    return False
+
+
+def refresh_snapshot(user_id, section=None):
+    """
+    Bring the snapshot of a user up to date after ``section`` changed.
+
+    Only the changed part of the document is rebuilt when the snapshot exists
+    and the section is known; otherwise the whole document is. Callers pass
+    no section when the snapshot was already stale before the change, as
+    other parts of it may be outdated too.
+    """
+    with transaction.atomic():
+        snapshot = ResumeSnapshot.objects.select_for_update().filter(pk=user_id).first()
+        if snapshot is None or section is None:
+            documents = build_resume_documents([user_id])
+            if documents:
+                save_snapshots(documents)
+            return
+
+        document = loads(snapshot.document)
+        document.update(build_resume_section(user_id, section))
+        snapshot.document = dumps(document)
+        snapshot.checksum = get_checksum(snapshot.document)
+        snapshot.stale = False
+        snapshot.save()
+
+
+def refresh_snapshot_quietly(user_id, section=None):
+    """
+    ``refresh_snapshot`` for ``on_commit`` hooks: a failure leaves the snapshot
+    stale, to be rebuilt on the next read, instead of failing a committed write.
+    """
+    try:
+        refresh_snapshot(user_id, section)
+    except Exception:
+        logger.exception('Could not refresh the resume snapshot of user %s', user_id)
+
+
+def find_inconsistent_snapshots(user_ids):
+    """
+    Compare the snapshots of ``user_ids`` with freshly built documents.
+
+    Returns ``{user_id: reason}`` for every snapshot that is missing, flagged
+    stale or whose content differs from the section tables.
+    """
+    documents = build_resume_documents(user_ids)
+    snapshots = {
+        user_id: (checksum, stale)
+        for user_id, checksum, stale in ResumeSnapshot.objects.filter(pk__in=documents).values_list(
+            'pk', 'checksum', 'stale')
+    }
+
+    problems = {}
+    for user_id, document in documents.items():
+        if user_id not in snapshots:
+            problems[user_id] = 'missing'
+        elif snapshots[user_id][1]:
+            problems[user_id] = 'stale'
+        elif snapshots[user_id][0] != get_checksum(dumps(document)):
+            problems[user_id] = 'outdated'
+    return problems
@@ -0,0 +1,42 @@
+import tempfile
+from io import StringIO
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from resumes import rendering
+from resumes.exports import iter_resume_lines
+from resumes.services import get_resume_document
+from tasks.registry import task
+
+
+@task('resumes.render')
+def render_resume(user_id, fmt):
+    document = get_resume_document(user_id)
+    name = rendering.get_artifact_name(user_id, rendering.get_artifact_key(document), fmt)
+    return rendering.render_artifact(document, fmt, name)
+
+
+@task('resumes.export')
+def export_resumes():
+    with tempfile.TemporaryFile() as output:
+        for block in iter_resume_lines():
+            output.write(block)
+        return default_storage.save(f'resume-exports/{timezone.now():%Y%m%d%H%M%S}.ndjson', File(output))
+
+
+@task('resumes.import')
+def import_resumes(path):
+    out = StringIO()
+    # Forking a process pool from a worker thread is not safe.
+    call_command('import_resumes', path, workers=1, stdout=out, stderr=StringIO())
+    return out.getvalue().strip()
+
+
+@task('resumes.rebuild_snapshots')
+def rebuild_resume_snapshots():
+    out = StringIO()
+    call_command('rebuild_resume_snapshots', workers=1, stdout=out)
+    return out.getvalue().strip()
@@ -1,10 +1,42 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-from resumes.models import Skill, Education, Certificate, Experience, Bio
+from accounts.authentication import is_denied
+from resumes import cache as resume_cache
+from resumes import rendering
+from resumes import signals as resume_signals
+from resumes.api.pagination import KeysetCursorPagination
+from resumes.api.serializers import (
+    SkillSerializer,
+    EducationSerializer,
+    CertificateSerializer,
+    ExperienceSerializer,
+    ResumeSerializer,
+    ResumeWriteSerializer,
+)
+from resumes.documents import build_public_document, build_resume_document
+from resumes.models import Skill, Education, Certificate, Experience, Bio, ResumeSnapshot, ResumeShare
+from resumes.sharing import get_purge_handler
+from resumes.services import apply_resume_document, get_resume_queryset
+from resumes.snapshots import find_inconsistent_snapshots, get_snapshot_document, refresh_snapshot
 
 User = get_user_model()
 
@@ -190,9 +222,9 @@ class CertificateAPITestCase(TestCase):
     def test_list_certificates(self):
         response = self.client.get(reverse('resumes:certificates-list-create'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['issuing_authority'], self.certificate.issuing_authority)
-        self.assertEqual(response.data[0]['issue_date'], str(self.certificate.issue_date))
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['issuing_authority'], self.certificate.issuing_authority)
+        self.assertEqual(response.data['results'][0]['issue_date'], str(self.certificate.issue_date))
 
     def test_create_certificate(self):
         data = {
@@ -244,12 +276,12 @@ class ExperienceAPITestCase(TestCase):
     def test_list_experiences(self):
         response = self.client.get(reverse('resumes:experiences-list-create'))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['company'], self.experience.company)
-        self.assertEqual(response.data[0]['position'], self.experience.position)
-        self.assertEqual(response.data[0]['start_date'], str(self.experience.start_date))
-        self.assertEqual(response.data[0]['end_date'], str(self.experience.end_date))
-        self.assertEqual(response.data[0]['description'], self.experience.description)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['company'], self.experience.company)
+        self.assertEqual(response.data['results'][0]['position'], self.experience.position)
+        self.assertEqual(response.data['results'][0]['start_date'], str(self.experience.start_date))
+        self.assertEqual(response.data['results'][0]['end_date'], str(self.experience.end_date))
+        self.assertEqual(response.data['results'][0]['description'], self.experience.description)
 
     def test_create_experience(self):
         data = {
@@ -327,3 +359,966 @@ class ResumeAPITestCase(TestCase):
         self.assertEqual(len(response.data['certificates']), self.user.certificates.count())
         self.assertEqual(len(response.data['experiences']), self.user.experiences.count())
         self.assertEqual(response.data['bio']['content'], self.bio.content)
+
+
+class ResumeQueryCountTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.resume_url = reverse('resumes:resume-retrieve')
+        Bio.objects.create(user=self.user, content='Bio content')
+
+    def add_sections(self, count):
+        for i in range(count):
+            Skill.objects.create(user=self.user, title=f'Skill {i}', rate=3)
+            Education.objects.create(user=self.user, institution=f'University {i}', degree='Bachelor',
+                                     start_date='2020-01-01')
+            Certificate.objects.create(user=self.user, issuing_authority=f'Authority {i}', issue_date='2022-01-01')
+            Experience.objects.create(user=self.user, company=f'Company {i}', position='Position',
+                                      start_date='2021-01-01', description='Description')
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.resume_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def test_query_count_is_constant(self):
+        # Both reads below then replace a stale snapshot rather than create one.
+        self.count_queries()
+        self.add_sections(1)
+        small, response = self.count_queries()
+        self.assertEqual(len(response.data['skills']), 1)
+
+        self.add_sections(20)
+        large, response = self.count_queries()
+        self.assertEqual(len(response.data['skills']), 21)
+        self.assertEqual(len(response.data['experiences']), 21)
+        self.assertEqual(response.data['bio']['content'], 'Bio content')
+
+        # Probe, snapshot lookup, five reads to rebuild it and the snapshot write.
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 11)
+
+
+class ResumeCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        resume_cache.stats.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.resume_url = reverse('resumes:resume-retrieve')
+        self.bio = Bio.objects.create(user=self.user, content='Bio content')
+
+    def test_second_read_is_served_from_cache(self):
+        self.client.get(self.resume_url)
+        # Only the conditional-GET probe reaches the database.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.resume_url)
+        self.assertEqual(response.data['bio']['content'], 'Bio content')
+        self.assertEqual(resume_cache.stats.as_dict(), {'hits': 1, 'misses': 1})
+
+    def test_section_save_invalidates(self):
+        self.client.get(self.resume_url)
+        Skill.objects.create(user=self.user, title='Programming', rate=4)
+        response = self.client.get(self.resume_url)
+        self.assertEqual(len(response.data['skills']), 1)
+
+        self.bio.content = 'Updated'
+        self.bio.save()
+        response = self.client.get(self.resume_url)
+        self.assertEqual(response.data['bio']['content'], 'Updated')
+
+    def test_section_delete_invalidates(self):
+        skill = Skill.objects.create(user=self.user, title='Programming', rate=4)
+        self.client.get(self.resume_url)
+        skill.delete()
+        response = self.client.get(self.resume_url)
+        self.assertEqual(len(response.data['skills']), 0)
+
+    def test_user_save_invalidates(self):
+        self.client.get(self.resume_url)
+        self.user.first_name = 'Jane'
+        self.user.save()
+        response = self.client.get(self.resume_url)
+        self.assertEqual(response.data['first_name'], 'Jane')
+
+    def test_evicted_version_is_not_reused(self):
+        version = resume_cache.get_version(self.user.pk)
+        cache.delete(resume_cache.VERSION_KEY.format(user_id=self.user.pk))
+        self.assertGreater(resume_cache.get_version(self.user.pk), version)
+
+
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.resume_url = reverse('resumes:resume-retrieve')
+        self.skills_url = reverse('resumes:skills-list-create')
+        Bio.objects.create(user=self.user, content='Bio content')
+        self.skill = Skill.objects.create(user=self.user, title='Programming', rate=4)
+        self.skill_url = reverse('resumes:skill-retrieve-update-destroy', args=[self.skill.id])
+
+    def test_list_sends_validators(self):
+        response = self.client.get(self.skills_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_if_modified_since_is_ignored(self):
+        other = Skill.objects.create(user=self.user, title='Design', rate=3)
+        self.client.get(self.skills_url)
+        other.delete()
+        for url in (self.skills_url, self.resume_url):
+            response = self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_media_type(self):
+        json_etag = self.client.get(self.skills_url, HTTP_ACCEPT='application/json')['ETag']
+        html_etag = self.client.get(self.skills_url, HTTP_ACCEPT='text/html')['ETag']
+        self.assertNotEqual(json_etag, html_etag)
+
+    def test_matching_etag_returns_not_modified(self):
+        for url in (self.resume_url, self.skills_url, self.skill_url):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+
+    def test_deletion_changes_etag(self):
+        other = Skill.objects.create(user=self.user, title='Design', rate=3)
+        etag = self.client.get(self.skills_url)['ETag']
+        other.delete()
+        response = self.client.get(self.skills_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_update_changes_resume_etag(self):
+        etag = self.client.get(self.resume_url)['ETag']
+        self.skill.rate = 5
+        self.skill.save()
+        response = self.client.get(self.resume_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['skills'][0]['rate'], 5)
+
+
+class CursorPaginationTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.skills_url = reverse('resumes:skills-list-create')
+        self.certificates_url = reverse('resumes:certificates-list-create')
+
+    def collect(self, url):
+        ids = []
+        response = self.client.get(url)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_pages_follow_ordering_with_id_tiebreaker(self):
+        skills = [Skill.objects.create(user=self.user, title=title, rate=3)
+                  for title in ['Python', 'Django', 'Python', 'Go', 'Python']]
+        ids, _ = self.collect(self.skills_url + '?page_size=2')
+        expected = sorted(skills, key=lambda skill: (skill.title, skill.id))
+        self.assertEqual(ids, [skill.id for skill in expected])
+
+    def test_descending_ordering_and_previous_link(self):
+        certificates = [Certificate.objects.create(user=self.user, issuing_authority=f'Authority {i}',
+                                                   issue_date=date)
+                        for i, date in enumerate(['2020-01-01', '2022-01-01', '2022-01-01', '2021-01-01'])]
+        ids, last_page = self.collect(self.certificates_url + '?page_size=2')
+        expected = sorted(certificates, key=lambda certificate: (str(certificate.issue_date), certificate.id),
+                          reverse=True)
+        self.assertEqual(ids, [certificate.id for certificate in expected])
+
+        response = self.client.get(last_page.data['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], ids[:2])
+        self.assertIsNone(response.data['previous'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.skills_url + '?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BulkSectionAPITestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other = User.objects.create_user(username='otheruser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.skills_url = reverse('resumes:skills-list-create')
+
+    def test_bulk_create(self):
+        data = [{'title': 'Python', 'rate': 5}, {'title': 'Go', 'rate': 3}]
+        response = self.client.post(self.skills_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['title'] for item in response.data], ['Python', 'Go'])
+        self.assertTrue(all(item['id'] for item in response.data))
+        self.assertEqual(self.user.skills.count(), 2)
+
+    def test_bulk_create_rejects_whole_batch(self):
+        data = [{'title': 'Python', 'rate': 5}, {'title': 'Go', 'rate': 6}]
+        response = self.client.post(self.skills_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('rate', response.data[1])
+        self.assertEqual(self.user.skills.count(), 0)
+
+    def test_bulk_create_partial(self):
+        data = [{'title': 'Python', 'rate': 5}, {'title': 'Go', 'rate': 6}]
+        response = self.client.post(self.skills_url + '?partial=true', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['results'][0]['title'], 'Python')
+        self.assertIsNone(response.data['results'][1])
+        self.assertIsNone(response.data['errors'][0])
+        self.assertIn('rate', response.data['errors'][1])
+        self.assertEqual(self.user.skills.count(), 1)
+
+    def test_bulk_update(self):
+        python = Skill.objects.create(user=self.user, title='Python', rate=3)
+        go = Skill.objects.create(user=self.user, title='Go', rate=3)
+        data = [{'id': python.pk, 'rate': 5}, {'id': go.pk, 'title': 'Golang'}]
+        response = self.client.patch(self.skills_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        python.refresh_from_db()
+        go.refresh_from_db()
+        self.assertEqual((python.title, python.rate), ('Python', 5))
+        self.assertEqual((go.title, go.rate), ('Golang', 3))
+
+    def test_bulk_update_ignores_foreign_rows(self):
+        foreign = Skill.objects.create(user=self.other, title='Python', rate=3)
+        response = self.client.patch(self.skills_url, [{'id': foreign.pk, 'rate': 5}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.rate, 3)
+
+    def test_bulk_delete(self):
+        skills = [Skill.objects.create(user=self.user, title=title, rate=3) for title in ['Python', 'Go']]
+        foreign = Skill.objects.create(user=self.other, title='Python', rate=3)
+
+        response = self.client.delete(self.skills_url, [skill.pk for skill in skills] + [foreign.pk], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.user.skills.count(), 2)
+
+        response = self.client.delete(self.skills_url + '?partial=true', [skill.pk for skill in skills] + [foreign.pk],
+                                      format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(self.user.skills.count(), 0)
+        self.assertTrue(Skill.objects.filter(pk=foreign.pk).exists())
+
+    def test_bulk_delete_query_count_is_constant(self):
+        def count_queries(size):
+            Skill.objects.bulk_create(Skill(user=self.user, title=f'Skill {i}', rate=3) for i in range(size))
+            ids = list(self.user.skills.values_list('pk', flat=True))
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.delete(self.skills_url, ids, format='json')
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+            self.assertEqual(self.user.skills.count(), 0)
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(5), count_queries(50))
+
+    def test_bulk_rejects_invalid_ids(self):
+        skill = Skill.objects.create(user=self.user, title='Python', rate=3)
+        ids = [True, [[1]], '1', skill.pk + 1000]
+        response = self.client.delete(self.skills_url + '?partial=true', ids, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['errors'], [{'id': ['Invalid.']}] * 3 + [{'id': ['Not found.']}])
+
+        data = [{'id': True, 'rate': 5}, {'id': [[skill.pk]], 'rate': 5}]
+        response = self.client.patch(self.skills_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data, [{'id': ['Invalid.']}] * 2)
+        skill.refresh_from_db()
+        self.assertEqual(skill.rate, 3)
+
+
+class ResumeReplaceAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.resume_url = reverse('resumes:resume-retrieve')
+        self.bio = Bio.objects.create(user=self.user, content='Bio content')
+        self.python = Skill.objects.create(user=self.user, title='Python', rate=3)
+        self.go = Skill.objects.create(user=self.user, title='Go', rate=3)
+        self.certificate = Certificate.objects.create(user=self.user, issuing_authority='Authority',
+                                                      issue_date='2022-01-01')
+
+    def get_document(self):
+        return self.client.get(self.resume_url).json()
+
+    def test_put_applies_diff(self):
+        document = self.get_document()
+        document['first_name'] = 'Jane'
+        document['skills'] = [
+            {'id': self.python.pk, 'title': 'Python', 'rate': 5},
+            {'title': 'Rust', 'rate': 2},
+        ]
+        document['bio'] = {'content': 'New bio'}
+
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Jane')
+        self.assertEqual([(skill['title'], skill['rate']) for skill in response.data['skills']],
+                         [('Python', 5), ('Rust', 2)])
+        self.assertFalse(Skill.objects.filter(pk=self.go.pk).exists())
+        self.assertEqual(response.data['bio']['content'], 'New bio')
+        self.assertEqual(len(response.data['certificates']), 1)
+
+    def test_put_deletes_rows_in_one_query(self):
+        document = self.get_document()
+        document['skills'] = []
+        Skill.objects.bulk_create(Skill(user=self.user, title=f'Skill {i}', rate=3) for i in range(50))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['skills'], [])
+        deletes = [query['sql'] for query in context.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+
+    def test_unchanged_rows_are_not_touched(self):
+        modified_time = self.certificate.modified_time
+        document = self.get_document()
+        document['skills'][0]['rate'] = 1
+
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.certificate.refresh_from_db()
+        self.assertEqual(self.certificate.modified_time, modified_time)
+
+    def test_unchanged_document_writes_nothing(self):
+        document = self.get_document()
+        # The savepoint pair plus the five reads of the stored resume.
+        with self.assertNumQueries(7):
+            serializer = ResumeWriteSerializer(data=document)
+            serializer.is_valid(raise_exception=True)
+            self.assertFalse(apply_resume_document(self.user.pk, serializer.validated_data))
+
+    def test_email_of_another_user_is_rejected(self):
+        User.objects.create_user(username='alice', email='alice@x.com', password='testpassword')
+        document = self.get_document()
+        document['email'] = 'ALICE@x.com'
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['email'], ['Email address is already in use.'])
+
+        # Taken between validation and the write.
+        with mock.patch.object(ResumeWriteSerializer, 'validate_email', side_effect=lambda value: value):
+            response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['email'], ['Email address is already in use.'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email, '')
+
+        document['email'] = 'TestUser@x.com'
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_duplicate_ids_are_rejected(self):
+        document = self.get_document()
+        document['skills'] = [{'id': self.python.pk, 'title': 'Python', 'rate': 5}] * 2
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_foreign_ids_are_inserted_not_updated(self):
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        foreign = Skill.objects.create(user=other, title='Python', rate=3)
+        document = self.get_document()
+        document['skills'] = [{'id': foreign.pk, 'title': 'Hacked', 'rate': 1}]
+
+        response = self.client.put(self.resume_url, document, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.title, 'Python')
+        self.assertEqual(self.user.skills.get().title, 'Hacked')
+
+
+class OwnershipQueryCountTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other = User.objects.create_user(username='otheruser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        skill = Skill.objects.create(user=self.user, title='Programming', rate=4)
+        education = Education.objects.create(user=self.user, institution='University', degree='Bachelor',
+                                             start_date='2020-01-01')
+        certificate = Certificate.objects.create(user=self.user, issuing_authority='Authority',
+                                                 issue_date='2022-01-01')
+        experience = Experience.objects.create(user=self.user, company='Company', position='Position',
+                                               start_date='2021-01-01', description='Description')
+        self.urls = [
+            reverse('resumes:skill-retrieve-update-destroy', args=[skill.pk]),
+            reverse('resumes:education-retrieve-update-destroy', args=[education.pk]),
+            reverse('resumes:certificate-retrieve-update-destroy', args=[certificate.pk]),
+            reverse('resumes:experience-retrieve-update-destroy', args=[experience.pk]),
+        ]
+
+    def test_owner_detail_queries(self):
+        for url in self.urls:
+            # The conditional-GET probe and the scoped object lookup.
+            with self.subTest(url=url), self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_owner_delete_queries(self):
+        for url in self.urls:
+            # The refresh after commit never runs in a test, so a read stores a fresh snapshot first.
+            get_snapshot_document(self.user.pk)
+            # The scoped lookup, the delete and flagging the resume snapshot stale.
+            with self.subTest(url=url), self.assertNumQueries(3):
+                response = self.client.delete(url)
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_non_owner_gets_not_found(self):
+        self.client.force_authenticate(user=self.other)
+        for url in self.urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                with self.assertNumQueries(1):
+                    response = self.client.put(url, {})
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+                with self.assertNumQueries(1):
+                    response = self.client.delete(url)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FieldPlanReadPathTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', email='jane@example.com',
+                                             password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        for i in range(3):
+            Skill.objects.create(user=self.user, title=f'Skill {i}', rate=i + 1)
+            Education.objects.create(user=self.user, institution=f'University {i}', degree='Bachelor',
+                                     start_date=f'201{i}-01-01', end_date=None if i else '2015-01-01')
+            Certificate.objects.create(user=self.user, issuing_authority=f'Authority {i}', issue_date=f'202{i}-01-01')
+            Experience.objects.create(user=self.user, company=f'Company {i}', position='Position',
+                                      start_date=f'201{i}-06-01', description='Description')
+
+    def assertSameJSON(self, fast, slow):
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(slow))
+
+    def test_resume_document_matches_serializer(self):
+        def serialize():
+            return ResumeSerializer(get_resume_queryset().get(pk=self.user.pk)).data
+
+        self.assertSameJSON(build_resume_document(self.user.pk), serialize())
+
+        Bio.objects.create(user=self.user, content='Bio content')
+        self.assertSameJSON(build_resume_document(self.user.pk), serialize())
+
+    def test_lists_match_serializers(self):
+        cases = [
+            ('resumes:skills-list-create', SkillSerializer, Skill),
+            ('resumes:educations-list-create', EducationSerializer, Education),
+            ('resumes:certificates-list-create', CertificateSerializer, Certificate),
+            ('resumes:experiences-list-create', ExperienceSerializer, Experience),
+        ]
+        for name, serializer_class, model in cases:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                queryset = model.objects.filter(user=self.user)
+                ordering = KeysetCursorPagination().get_ordering(None, queryset, None)
+                expected = serializer_class(queryset.order_by(*ordering), many=True).data
+                self.assertSameJSON(response.data['results'], expected)
+
+
+class ResumeSnapshotTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', password='testpassword')
+        Skill.objects.create(user=self.user, title='Python', rate=5)
+
+    def test_read_repairs_missing_and_stale_snapshots(self):
+        self.assertFalse(ResumeSnapshot.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(get_snapshot_document(self.user.pk), build_resume_document(self.user.pk))
+        self.assertFalse(ResumeSnapshot.objects.get(pk=self.user.pk).stale)
+
+        with self.assertNumQueries(1):
+            get_snapshot_document(self.user.pk)
+
+        # Saving a section flags the snapshot; the refresh itself waits for the commit.
+        Skill.objects.create(user=self.user, title='Django', rate=4)
+        self.assertTrue(ResumeSnapshot.objects.get(pk=self.user.pk).stale)
+        self.assertEqual(len(get_snapshot_document(self.user.pk)['skills']), 2)
+        self.assertFalse(ResumeSnapshot.objects.get(pk=self.user.pk).stale)
+
+    def test_refresh_patches_one_section(self):
+        get_snapshot_document(self.user.pk)
+        Bio.objects.create(user=self.user, content='Bio content')
+        refresh_snapshot(self.user.pk, 'bio')
+
+        snapshot = ResumeSnapshot.objects.get(pk=self.user.pk)
+        self.assertFalse(snapshot.stale)
+        self.assertEqual(get_snapshot_document(self.user.pk), build_resume_document(self.user.pk))
+        self.assertEqual(find_inconsistent_snapshots([self.user.pk]), {})
+
+    def test_read_does_not_store_over_a_later_change(self):
+        get_snapshot_document(self.user.pk)
+        ResumeSnapshot.objects.filter(pk=self.user.pk).update(stale=True)
+        build = build_resume_document
+
+        def build_then_change(user_id):
+            document = build(user_id)
+            # A writer flags the snapshot while the read is still building it.
+            Skill.objects.create(user=self.user, title='Django', rate=4)
+            return document
+
+        with mock.patch('resumes.snapshots.build_resume_document', side_effect=build_then_change):
+            self.assertEqual(len(get_snapshot_document(self.user.pk)['skills']), 1)
+        self.assertTrue(ResumeSnapshot.objects.get(pk=self.user.pk).stale)
+        self.assertEqual(len(get_snapshot_document(self.user.pk)['skills']), 2)
+
+    def test_change_to_stale_snapshot_rebuilds_whole_document(self):
+        resume_signals._batches.current = None
+        get_snapshot_document(self.user.pk)
+        # An earlier refresh failed and left the snapshot behind the skills table.
+        Skill.objects.filter(user=self.user).update(title='Rust')
+        ResumeSnapshot.objects.filter(pk=self.user.pk).update(stale=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Bio.objects.create(user=self.user, content='Bio content')
+        self.assertEqual(find_inconsistent_snapshots([self.user.pk]), {})
+        self.assertEqual(get_snapshot_document(self.user.pk)['skills'][0]['title'], 'Rust')
+
+    def test_find_inconsistent_snapshots(self):
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        self.assertEqual(find_inconsistent_snapshots([self.user.pk, other.pk]),
+                         {self.user.pk: 'missing', other.pk: 'missing'})
+
+        get_snapshot_document(self.user.pk)
+        get_snapshot_document(other.pk)
+        ResumeSnapshot.objects.filter(pk=other.pk).update(stale=True)
+        ResumeSnapshot.objects.filter(pk=self.user.pk).update(document='{}')
+        # Bypasses the signals, so only the checksum can tell.
+        Skill.objects.filter(user=self.user).update(title='Rust')
+        self.assertEqual(find_inconsistent_snapshots([self.user.pk, other.pk]),
+                         {self.user.pk: 'outdated', other.pk: 'stale'})
+
+    def test_rebuild_command(self):
+        for i in range(5):
+            User.objects.create_user(username=f'user{i}', password='testpassword')
+
+        out = StringIO()
+        call_command('rebuild_resume_snapshots', '--check', '--workers=1', '--batch-size=2', stdout=out)
+        self.assertIn('Checked 6 snapshots, 6 inconsistent.', out.getvalue())
+
+        call_command('rebuild_resume_snapshots', '--workers=1', '--batch-size=2', stdout=StringIO())
+        self.assertEqual(ResumeSnapshot.objects.count(), 6)
+
+        out = StringIO()
+        call_command('rebuild_resume_snapshots', '--check', '--workers=1', stdout=out)
+        self.assertIn('Checked 6 snapshots, 0 inconsistent.', out.getvalue())
+
+
+purged_keys = []
+
+
+def record_purge(keys):
+    purged_keys.extend(keys)
+
+
+@override_settings(RESUME_PURGE_HANDLER='resumes.tests.record_purge')
+class PublicResumeAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_purge_handler.cache_clear()
+        purged_keys.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        Skill.objects.create(user=self.user, title='Python', rate=5)
+        self.public = APIClient()
+
+    def tearDown(self):
+        get_purge_handler.cache_clear()
+
+    def share(self, data=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('resumes:resume-share'), data or {}, format='json')
+        return response
+
+    def test_publish_and_read(self):
+        response = self.share()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse('resumes:resume-public', kwargs={'slug': response.data['slug']})
+        self.assertTrue(response.data['url'].endswith(url))
+
+        response = self.public.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), build_public_document(build_resume_document(self.user.pk)))
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage=', response['Cache-Control'])
+        self.assertEqual(response['Surrogate-Key'], f'resume-{self.user.pk}')
+
+        with self.assertNumQueries(0):
+            response = self.public.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.public.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_edit_purges_and_changes_etag(self):
+        slug = self.share().data['slug']
+        url = reverse('resumes:resume-public', kwargs={'slug': slug})
+        etag = self.public.get(url)['ETag']
+        purged_keys.clear()
+
+        # A section untouched in setUp: the test transaction never commits, so
+        # its refresh would still count as scheduled.
+        with self.captureOnCommitCallbacks(execute=True):
+            Education.objects.create(user=self.user, institution='University', degree='Bachelor',
+                                     start_date='2015-01-01')
+        self.assertEqual(purged_keys, [f'resume-{self.user.pk}'])
+
+        response = self.public.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()['educations']), 1)
+
+    def test_unshared_resumes_are_not_purged(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(user=self.user, title='Django', rate=4)
+        self.assertEqual(purged_keys, [])
+
+    def test_unpublish_and_rotate(self):
+        slug = self.share().data['slug']
+        url = reverse('resumes:resume-public', kwargs={'slug': slug})
+        self.assertEqual(self.public.get(url).status_code, status.HTTP_200_OK)
+
+        response = self.share()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.data['slug'], slug)
+        self.assertEqual(self.public.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        url = reverse('resumes:resume-public', kwargs={'slug': response.data['slug']})
+        self.assertEqual(self.public.get(url).status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('resumes:resume-share'), {'is_public': False}, format='json')
+        self.assertEqual(self.public.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(reverse('resumes:resume-share'))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ResumeShare.objects.filter(user=self.user).exists())
+        self.assertEqual(self.client.get(reverse('resumes:resume-share')).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_public_document_hides_contact_details(self):
+        self.user.email = 'jane@example.com'
+        self.user.phone_number = '+15555550100'
+        self.user.save()
+        Bio.objects.create(user=self.user, content='Bio content')
+        url = reverse('resumes:resume-public', kwargs={'slug': self.share().data['slug']})
+
+        document = self.public.get(url).json()
+        self.assertEqual(document['first_name'], 'Jane')
+        self.assertNotIn('email', document)
+        self.assertNotIn('phone_number', document)
+        self.assertNotIn('user', document['skills'][0])
+        self.assertNotIn('user', document['bio'])
+        self.assertEqual(document['bio']['content'], 'Bio content')
+
+    def test_unknown_slug_is_cached(self):
+        url = reverse('resumes:resume-public', kwargs={'slug': 'missing'})
+        self.assertEqual(self.public.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.public.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_slug_is_not_found(self):
+        for path in ['public/a%20b', 'public/a%0Ab', 'public/' + 'a' * 300]:
+            with self.assertNumQueries(0), mock.patch('resumes.sharing.get_cache') as get_cache:
+                self.assertEqual(self.public.get(reverse('resumes:resume-retrieve') + path).status_code, status.HTTP_404_NOT_FOUND)
+            get_cache.assert_not_called()
+
+
+class ResumeExportTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='admin', password='testpassword', is_staff=True)
+        for i in range(5):
+            user = User.objects.create_user(username=f'user{i}', first_name=f'User {i}', password='testpassword')
+            Skill.objects.create(user=user, title=f'Skill {i}', rate=i + 1)
+            Bio.objects.create(user=user, content=f'Bio {i}')
+
+    def assertExported(self, lines):
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row.pop('id') for row in rows], list(User.objects.order_by('pk').values_list('pk', flat=True)))
+        for row, user in zip(rows, User.objects.order_by('pk')):
+            self.assertEqual(row, build_resume_document(user.pk))
+
+    def test_command_queries_per_chunk(self):
+        out = StringIO()
+        # The id cursor, then five queries per chunk of two users.
+        with self.assertNumQueries(1 + 3 * 5):
+            call_command('export_resumes', '--chunk-size=2', stdout=out, stderr=StringIO())
+        self.assertExported(out.getvalue().splitlines())
+
+    def test_endpoint_streams_for_admins_only(self):
+        url = reverse('resumes:resume-export')
+        self.client.force_authenticate(user=User.objects.get(username='user0'))
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertExported(b''.join(response.streaming_content).splitlines())
+
+
+class ResumeImportTestCase(TestCase):
+    def setUp(self):
+        User.objects.create_user(username='existing', email='existing@example.com', password='testpassword')
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'resumes.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, *rows):
+        with open(self.path, 'w') as f:
+            for row in rows:
+                f.write(row if isinstance(row, str) else json.dumps(row))
+                f.write('\n')
+
+    def run_import(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_resumes', self.path, '--workers=1', '--batch-size=2', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import(self):
+        self.write(
+            {'username': 'jane', 'email': 'jane@example.com', 'password': 'a-long-passphrase', 'first_name': 'Jane',
+             'skills': [{'title': 'Python', 'rate': 5}],
+             'educations': [{'institution': 'University', 'degree': 'Bachelor', 'start_date': '2015-01-01',
+                             'end_date': '2019-01-01'}],
+             'bio': {'content': 'Bio content'}},
+            {'username': 'john', 'experiences': [{'company': 'Company', 'position': 'Engineer',
+                                                  'start_date': '2020-01-01', 'description': 'Description'}]},
+            '{not json',
+            {'username': 'existing'},
+            {'username': 'jane'},
+            {'username': 'weak', 'password': 'password'},
+            {'username': 'backwards', 'educations': [{'institution': 'University', 'degree': 'Bachelor',
+                                                      'start_date': '2019-01-01', 'end_date': '2015-01-01'}]},
+        )
+        out, err = self.run_import()
+        self.assertIn('Imported 2 users, rejected 5', out)
+        self.assertEqual([line.split(':')[0] for line in err.splitlines()],
+                         ['line 3', 'line 4', 'line 5', 'line 6', 'line 7'])
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+        jane = User.objects.get(username='jane')
+        self.assertTrue(jane.check_password('a-long-passphrase'))
+        self.assertFalse(User.objects.get(username='john').has_usable_password())
+        self.assertEqual(build_resume_document(jane.pk)['skills'][0]['title'], 'Python')
+        self.assertEqual(build_resume_document(jane.pk)['bio']['content'], 'Bio content')
+        self.assertEqual(Experience.objects.filter(user__username='john').count(), 1)
+        self.assertFalse(User.objects.filter(username__in=['weak', 'backwards']).exists())
+
+    def test_resumes_after_checkpoint(self):
+        self.write({'username': 'first'}, {'username': 'second'}, {'username': 'third'})
+        with open(f'{self.path}.checkpoint', 'w') as f:
+            json.dump({'line': 2}, f)
+
+        out, _ = self.run_import()
+        self.assertIn('Resuming after line 2.', out)
+        self.assertEqual(list(User.objects.filter(username__in=['first', 'second', 'third'])
+                              .values_list('username', flat=True)), ['third'])
+
+
+class ResumeRenderAPITestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.media.name, RESUME_RENDER_WAIT=5)
+        self.settings.enable()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', last_name='Doe',
+                                             password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        Skill.objects.create(user=self.user, title='Python', rate=5)
+        Experience.objects.create(user=self.user, company='Company', position='Engineer', start_date='2020-01-01',
+                                  description='Built things')
+
+    def tearDown(self):
+        self.settings.disable()
+        self.media.cleanup()
+
+    def url(self, fmt):
+        return reverse('resumes:resume-render', kwargs={'fmt': fmt})
+
+    def test_html_is_rendered_once(self):
+        response = self.client.get(self.url('html'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('Jane Doe', content)
+        self.assertIn('Engineer', content)
+        self.assertIn('Python', content)
+
+        def fail(document):
+            raise AssertionError('rendered again')
+
+        with mock.patch.dict(rendering.RENDERERS, {'html': fail}):
+            again = self.client.get(self.url('html'))
+            self.assertEqual(again.status_code, status.HTTP_200_OK)
+            self.assertEqual(b''.join(again.streaming_content).decode(), content)
+
+            response = self.client.get(self.url('html'), HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Skill.objects.create(user=self.user, title='Django', rate=4)
+        response = self.client.get(self.url('html'), HTTP_IF_NONE_MATCH=again['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Django', b''.join(response.streaming_content).decode())
+
+    def test_pdf(self):
+        response = self.client.get(self.url('pdf'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_accepted_while_rendering(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow(document):
+            started.set()
+            release.wait(5)
+            return rendering.render_html(document)
+
+        with override_settings(RESUME_RENDER_WAIT=0), mock.patch.dict(rendering.RENDERERS, {'html': slow}):
+            response = self.client.get(self.url('html'))
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response['Retry-After'], '1')
+            self.assertTrue(started.wait(5))
+
+            key = rendering.get_artifact_key(build_resume_document(self.user.pk))
+            name = rendering.get_artifact_name(self.user.pk, key, 'html')
+            future = rendering.submit_render(None, 'html', name)
+            release.set()
+            future.result(timeout=5)
+
+        self.assertEqual(self.client.get(self.url('html')).status_code, status.HTTP_200_OK)
+
+    def test_failed_render(self):
+        def fail(document):
+            raise ValueError('broken')
+
+        with mock.patch.dict(rendering.RENDERERS, {'html': fail}), self.assertLogs('resumes.api.views', 'ERROR'):
+            response = self.client.get(self.url('html'))
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.client.get(self.url('html')).status_code, status.HTTP_200_OK)
+
+    def test_new_render_replaces_previous_one(self):
+        self.client.get(self.url('html'))
+        self.client.get(self.url('pdf'))
+        Skill.objects.create(user=self.user, title='Django', rate=4)
+        self.assertEqual(self.client.get(self.url('html')).status_code, status.HTTP_200_OK)
+
+        directory = os.path.join(self.media.name, 'resume-renders', str(self.user.pk))
+        key = rendering.get_artifact_key(build_resume_document(self.user.pk))
+        # The previous PDF stays until a new one is rendered.
+        self.assertEqual([name for name in os.listdir(directory) if name.endswith('.html')], [f'{key}.html'])
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+    def test_pdf_dates_and_names(self):
+        document = build_resume_document(self.user.pk)
+        self.assertEqual(rendering.format_dates('2020-01-01', None), '2020-01-01 - present')
+        self.assertEqual(rendering.latin1('Zoë'), 'Zoë')
+        self.assertTrue(rendering.render_pdf(dict(document, first_name='Наталья')).startswith(b'%PDF'))
+
+    @override_settings(RESUME_RENDER_QUEUE=True)
+    def test_render_as_background_task(self):
+        response = self.client.get(self.url('pdf'))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.get(self.url('pdf'))['Location'], response['Location'])
+
+        call_command('run_tasks', '--once', '--concurrency=1', stdout=StringIO())
+        self.assertEqual(self.client.get(response['Location']).data['status'], 'succeeded')
+        self.assertEqual(self.client.get(self.url('pdf')).status_code, status.HTTP_200_OK)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get(self.url('docx')).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AsyncResumeViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', first_name='Jane', password='testpassword')
+        Skill.objects.create(user=self.user, title='Python', rate=5)
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def test_resume(self):
+        url = reverse('resumes:resume-async')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer nope').status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(url, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), build_resume_document(self.user.pk))
+
+        stateless = dict(settings.REST_FRAMEWORK, DEFAULT_AUTHENTICATION_CLASSES=[
+            'accounts.authentication.StatelessJWTAuthentication'])
+        with self.settings(REST_FRAMEWORK=stateless), self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, **self.auth).status_code, status.HTTP_200_OK)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Skill.objects.create(user=self.user, title='Django', rate=4)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(len(response.json()['skills']), 2)
+
+    async def test_cache_lookups_stay_off_the_event_loop(self):
+        def off_loop(func):
+            def wrapper(*args):
+                with self.assertRaises(RuntimeError):
+                    asyncio.get_running_loop()
+                return func(*args)
+            return wrapper
+
+        client = AsyncClient()
+        url = reverse('resumes:resume-async')
+        stateless = dict(settings.REST_FRAMEWORK, DEFAULT_AUTHENTICATION_CLASSES=[
+            'accounts.authentication.StatelessJWTAuthentication'])
+        with self.settings(REST_FRAMEWORK=stateless), \
+                mock.patch('resumes.api.async_views.get_version', side_effect=off_loop(resume_cache.get_version)), \
+                mock.patch('accounts.authentication.is_denied', side_effect=off_loop(is_denied)) as denied:
+            # Django 3.2's AsyncClient takes extra arguments as raw header names.
+            headers = {'authorization': self.auth['HTTP_AUTHORIZATION']}
+            response = await client.get(url, **headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = await client.get(url, **{'if-none-match': response['ETag']}, **headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertTrue(denied.called)
+
+    def test_sections(self):
+        response = self.client.get(reverse('resumes:resume-async-section', kwargs={'section': 'skills'}), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([skill['title'] for skill in response.json()], ['Python'])
+
+        response = self.client.get(reverse('resumes:resume-async-section', kwargs={'section': 'bio'}), **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
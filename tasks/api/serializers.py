@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from tasks.models import Task
+
+
+class TaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ['id', 'name', 'status', 'attempts', 'max_attempts', 'result', 'run_at', 'created_time',
+                  'modified_time']
+        read_only_fields = fields
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import TaskRetrieveAPIView
+
+app_name = 'tasks'
+
+urlpatterns = [
+    path('<int:pk>', TaskRetrieveAPIView.as_view(), name='task-retrieve'),
+]
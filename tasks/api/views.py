@@ -0,0 +1,17 @@
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+
+from tasks.api.serializers import TaskSerializer
+from tasks.models import Task
+
+
+class TaskRetrieveAPIView(generics.RetrieveAPIView):
+    """
+    ⏳ API view to follow the status of a background task of the authenticated user.
+    """
+    queryset = Task.objects.all()
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated, ]
+
+    def get_queryset(self):
+        return self.queryset.filter(user_id=self.request.user.pk)
@@ -0,0 +1,77 @@
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tasks.services import claim_tasks, requeue_stale_tasks, run_task
+from utils.db import recycle_connections
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks. Start several of these processes to scale out.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Worker threads; 1 runs tasks inline.')
+        parser.add_argument('--batch-size', type=int, default=10, help='Tasks claimed per query.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty.')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        self.counts = {'succeeded': 0, 'failed': 0}
+        self.counts_lock = threading.Lock()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: self.stopping.set())
+
+        requeued = requeue_stale_tasks()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale tasks.')
+
+        started = time.perf_counter()
+        if options['concurrency'] <= 1:
+            self.work(options, close_connection=False)
+        else:
+            threads = [
+                threading.Thread(target=self.work, args=(options,), name=f'task-worker-{i}', daemon=True)
+                for i in range(options['concurrency'])
+            ]
+            for thread in threads:
+                thread.start()
+            try:
+                for thread in threads:
+                    while thread.is_alive():
+                        thread.join(timeout=1)
+            except KeyboardInterrupt:
+                self.stopping.set()
+
+        elapsed = time.perf_counter() - started
+        total = self.counts['succeeded'] + self.counts['failed']
+        self.stdout.write(f"Ran {total} tasks ({self.counts['failed']} failed), {total / elapsed:.0f} tasks/s.")
+
+    def work(self, options, close_connection=True):
+        last_requeue = time.monotonic()
+        try:
+            while not self.stopping.is_set():
+                recycle_connections()
+                tasks = claim_tasks(options['batch_size'])
+                if not tasks:
+                    if options['once']:
+                        return
+                    self.stopping.wait(options['poll_interval'])
+                    if time.monotonic() - last_requeue > settings.TASK_LOCK_TIMEOUT:
+                        requeue_stale_tasks()
+                        last_requeue = time.monotonic()
+                    continue
+
+                for task in tasks:
+                    succeeded = run_task(task)
+                    with self.counts_lock:
+                        self.counts['succeeded' if succeeded else 'failed'] += 1
+        finally:
+            if close_connection:
+                # Each worker thread holds its own connection.
+                connection.close()
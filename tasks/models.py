@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import ugettext as _
+
+from utils.models import BaseModel
+
+User = get_user_model()
+
+
+class Task(BaseModel):
+    """
+    A unit of background work, claimed by ``run_tasks`` workers.
+
+    ``dedupe_key`` is unique per user among queued and running tasks, so
+    asking again for work that is already pending returns the pending task.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, _('Queued')),
+        (RUNNING, _('Running')),
+        (SUCCEEDED, _('Succeeded')),
+        (FAILED, _('Failed')),
+    )
+    ACTIVE = (QUEUED, RUNNING)
+
+    name = models.CharField(max_length=100, verbose_name=_('name'))
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name=_('arguments'))
+    user = models.ForeignKey(User, verbose_name=_('user'), related_name='tasks', null=True, blank=True,
+                             on_delete=models.CASCADE)
+    dedupe_key = models.CharField(max_length=100, blank=True, verbose_name=_('deduplication key'))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name=_('status'))
+    run_at = models.DateTimeField(default=timezone.now, verbose_name=_('run at'))
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name=_('locked at'))
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name=_('attempts'))
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name=_('max attempts'))
+    result = models.JSONField(null=True, blank=True, verbose_name=_('result'))
+    error = models.TextField(blank=True, verbose_name=_('error'))
+
+    class Meta:
+        verbose_name = _('Task')
+        verbose_name_plural = _('Tasks')
+        db_table = 'task'
+        indexes = [
+            # Workers only ever scan the queued tasks that are due.
+            models.Index(fields=['run_at', 'id'], condition=Q(status='queued'), name='task_queued_idx'),
+            models.Index(fields=['locked_at'], condition=Q(status='running'), name='task_running_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'dedupe_key'], name='task_active_dedupe_key',
+                                    condition=Q(status__in=('queued', 'running')) & ~Q(dedupe_key='')),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,18 @@
+registry = {}
+
+
+def task(name):
+    """
+    Register the decorated function as the task ``name``.
+
+    Tasks are called with the keyword arguments they were enqueued with and
+    return a JSON-serializable result.
+    """
+    def register(func):
+        registry[name] = func
+        return func
+    return register
+
+
+def get_task(name):
+    return registry[name]
@@ -0,0 +1,120 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(name, kwargs=None, user_id=None, dedupe_key='', max_attempts=3):
+    """
+    Queue the task ``name`` to be called with the keyword arguments ``kwargs``.
+
+    With a ``dedupe_key``, the user's queued or running task with that key is
+    returned instead when there is one.
+    """
+    get_task(name)
+    task = Task(name=name, kwargs=kwargs or {}, user_id=user_id, dedupe_key=dedupe_key, max_attempts=max_attempts)
+    if not dedupe_key:
+        task.save()
+        return task
+
+    try:
+        with transaction.atomic():
+            task.save()
+        return task
+    except IntegrityError:
+        existing = Task.objects.filter(user_id=user_id, dedupe_key=dedupe_key, status__in=Task.ACTIVE).first()
+        if existing is None:
+            # The other task finished in the meantime.
+            return enqueue(name, kwargs, user_id, dedupe_key, max_attempts)
+        return existing
+
+
+def claim_tasks(limit):
+    """
+    Mark up to ``limit`` due tasks as running and return them.
+
+    ``SKIP LOCKED`` lets concurrent workers claim disjoint batches without
+    waiting on each other's row locks; a batch costs two queries.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status=Task.QUEUED, run_at__lte=now)
+            .order_by('run_at', 'id')[:limit]
+        )
+        if tasks:
+            Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+                status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1)
+    for task in tasks:
+        task.status, task.locked_at, task.attempts = Task.RUNNING, now, task.attempts + 1
+    return tasks
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=settings.TASK_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def record_failure(task, error, retry=True):
+    task.error = error
+    if retry and task.attempts < task.max_attempts:
+        task.status = Task.QUEUED
+        task.run_at = timezone.now() + get_retry_delay(task.attempts)
+    else:
+        task.status = Task.FAILED
+    task.locked_at = None
+    task.save(update_fields=['status', 'run_at', 'locked_at', 'error', 'modified_time'])
+
+
+def run_task(task):
+    """
+    Call a claimed task and record its outcome.
+
+    A failing task goes back to the queue with exponential backoff until it
+    has used up ``max_attempts``. A result that cannot be stored as JSON
+    fails the task for good, as running it again would return the same.
+    """
+    try:
+        result = get_task(task.name)(**task.kwargs)
+    except Exception:
+        logger.exception('Task %s failed', task)
+        record_failure(task, traceback.format_exc())
+        return False
+
+    try:
+        json.dumps(result, cls=Task._meta.get_field('result').encoder)
+    except (TypeError, ValueError):
+        logger.exception('Task %s returned a result that cannot be stored', task)
+        record_failure(task, traceback.format_exc(), retry=False)
+        return False
+
+    task.status = Task.SUCCEEDED
+    task.result = result
+    task.locked_at = None
+    task.save(update_fields=['status', 'result', 'locked_at', 'modified_time'])
+    return True
+
+
+def requeue_stale_tasks():
+    """
+    Put back tasks whose worker stopped without recording an outcome.
+
+    Tasks that have used up ``max_attempts`` are failed instead, so that one
+    which keeps killing its worker is not run forever. Returns the number of
+    tasks put back.
+    """
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, locked_at__lt=now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, locked_at=None, error='The worker stopped before the task finished.', modified_time=now)
+    return stale.update(status=Task.QUEUED, locked_at=None, run_at=now, modified_time=now)
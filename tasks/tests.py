@@ -0,0 +1,135 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from tasks.registry import task
+from tasks.services import claim_tasks, enqueue, requeue_stale_tasks, run_task
+
+User = get_user_model()
+
+
+@task('tests.add')
+def add(a, b):
+    return a + b
+
+
+@task('tests.fail')
+def fail():
+    raise ValueError('broken')
+
+
+@task('tests.unserializable')
+def unserializable():
+    return object()
+
+
+class TaskQueueTestCase(TestCase):
+    def run_worker(self):
+        out = StringIO()
+        call_command('run_tasks', '--once', '--concurrency=1', stdout=out)
+        return out.getvalue()
+
+    def test_run(self):
+        tasks = [enqueue('tests.add', {'a': i, 'b': 1}) for i in range(3)]
+        self.assertIn('Ran 3 tasks (0 failed)', self.run_worker())
+        for i, queued in enumerate(tasks):
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, Task.SUCCEEDED)
+            self.assertEqual(queued.result, i + 1)
+            self.assertEqual(queued.attempts, 1)
+
+    def test_claim(self):
+        due = enqueue('tests.add', {'a': 1, 'b': 1})
+        later = enqueue('tests.add', {'a': 1, 'b': 1})
+        Task.objects.filter(pk=later.pk).update(run_at=timezone.now() + timedelta(minutes=1))
+
+        # The select and the update, inside a savepoint.
+        with self.assertNumQueries(4):
+            claimed = claim_tasks(10)
+        self.assertEqual([task.pk for task in claimed], [due.pk])
+        self.assertEqual(Task.objects.get(pk=due.pk).status, Task.RUNNING)
+        self.assertEqual(claim_tasks(10), [])
+
+    @override_settings(TASK_RETRY_DELAY=10)
+    def test_retries_with_backoff(self):
+        queued = enqueue('tests.fail', max_attempts=2)
+        with self.assertLogs('tasks.services', 'ERROR'):
+            run_task(claim_tasks(1)[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.QUEUED)
+        self.assertIn('ValueError: broken', queued.error)
+        self.assertGreater(queued.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertEqual(claim_tasks(1), [])
+
+        Task.objects.filter(pk=queued.pk).update(run_at=timezone.now())
+        with self.assertLogs('tasks.services', 'ERROR'):
+            run_task(claim_tasks(1)[0])
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_dedupe_key(self):
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        first = enqueue('tests.add', {'a': 1, 'b': 1}, user_id=user.pk, dedupe_key='sum')
+        self.assertEqual(enqueue('tests.add', {'a': 1, 'b': 1}, user_id=user.pk, dedupe_key='sum').pk, first.pk)
+        self.assertNotEqual(enqueue('tests.add', {'a': 1, 'b': 1}, user_id=other.pk, dedupe_key='sum').pk, first.pk)
+
+        self.run_worker()
+        self.assertNotEqual(enqueue('tests.add', {'a': 1, 'b': 1}, user_id=user.pk, dedupe_key='sum').pk, first.pk)
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_requeue_stale(self):
+        queued = enqueue('tests.add', {'a': 1, 'b': 1})
+        claim_tasks(1)
+        self.assertEqual(requeue_stale_tasks(), 0)
+
+        Task.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(requeue_stale_tasks(), 1)
+        self.assertEqual(Task.objects.get(pk=queued.pk).status, Task.QUEUED)
+
+    @override_settings(TASK_LOCK_TIMEOUT=60)
+    def test_stale_task_out_of_attempts_fails(self):
+        queued = enqueue('tests.add', {'a': 1, 'b': 1}, max_attempts=1)
+        claim_tasks(1)
+        Task.objects.filter(pk=queued.pk).update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(requeue_stale_tasks(), 0)
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIsNone(queued.locked_at)
+        self.assertIn('worker stopped', queued.error)
+
+    def test_unserializable_result_fails(self):
+        queued = enqueue('tests.unserializable')
+        with self.assertLogs('tasks.services', 'ERROR'):
+            self.assertFalse(run_task(claim_tasks(1)[0]))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIsNone(queued.result)
+        self.assertIn('TypeError', queued.error)
+
+    def test_status_endpoint(self):
+        user = User.objects.create_user(username='testuser', password='testpassword')
+        other = User.objects.create_user(username='otheruser', password='testpassword')
+        queued = enqueue('tests.add', {'a': 1, 'b': 1}, user_id=user.pk)
+        url = reverse('tasks:task-retrieve', kwargs={'pk': queued.pk})
+
+        client = APIClient()
+        client.force_authenticate(user=other)
+        self.assertEqual(client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        client.force_authenticate(user=user)
+        self.assertEqual(client.get(url).data['status'], Task.QUEUED)
+        self.run_worker()
+        response = client.get(url)
+        self.assertEqual(response.data['status'], Task.SUCCEEDED)
+        self.assertEqual(response.data['result'], 2)
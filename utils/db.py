@@ -0,0 +1,49 @@
+from django.db import connections
+
+
+class HealthCheckMixin:
+    """
+    Probe a reused connection on its first use in each request, as Django 4.1
+    does with ``CONN_HEALTH_CHECKS``, for a Django 3.2 database backend.
+
+    Django 3.2 only probes a reused connection after a query on it failed; a
+    connection killed by a database restart or a PgBouncer timeout is now
+    replaced instead of failing the request. Requests that never reach the
+    database, such as cache hits, skip the probe.
+    """
+    health_check_done = False
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        # Runs as every request starts and finishes.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def close_if_health_check_failed(self):
+        if self.connection is None or self.health_check_done or not self.settings_dict.get('CONN_HEALTH_CHECKS'):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def set_autocommit(self, *args, **kwargs):
+        self.close_if_health_check_failed()
+        return super().set_autocommit(*args, **kwargs)
+
+    def _cursor(self, *args, **kwargs):
+        self.close_if_health_check_failed()
+        return super()._cursor(*args, **kwargs)
+
+
+def recycle_connections():
+    """
+    Apply the per-request connection lifecycle in long-running loops outside
+    the request cycle, such as task workers: close connections that are past
+    ``CONN_MAX_AGE`` or broken, and health-check the rest on their next use.
+    """
+    for connection in connections.all():
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
@@ -0,0 +1,233 @@
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    'http_requests_total': ('counter', 'Requests served, by view, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'End-to-end request latency.'),
+    'http_request_db_queries_total': ('counter', 'Database queries run by requests.'),
+    'http_request_db_duration_seconds_total': ('counter', 'Time spent in database queries.'),
+    'http_request_render_duration_seconds_total': ('counter', 'Time spent rendering responses.'),
+    'http_request_repeated_queries_total': ('counter', 'Requests that repeated one SQL statement too often.'),
+}
+
+# "IN (%s, %s, ...)" lists of any length are the same statement shape.
+IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+# How often a worker writes its registry to the shared metrics directory.
+SAVE_INTERVAL = 1
+ARCHIVE_NAME = 'archive.json'
+
+
+class Registry:
+    """
+    Counters and histograms kept in the process, rendered in the Prometheus
+    text format. Each server worker process keeps its own; see
+    ``collect_metrics`` for the sum over all workers.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[name, labels] += value
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None:
+                histogram = self.histograms[name, labels] = {'buckets': [0] * len(buckets), 'sum': 0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters), {
+                key: {**histogram, 'buckets': list(histogram['buckets'])} for key, histogram in self.histograms.items()}
+
+    def merge(self, counters, histograms):
+        with self.lock:
+            for key, value in counters.items():
+                self.counters[key] += value
+            for key, histogram in histograms.items():
+                total = self.histograms.get(key)
+                if total is None:
+                    self.histograms[key] = {**histogram, 'buckets': list(histogram['buckets'])}
+                    continue
+                total['buckets'] = [a + b for a, b in zip(total['buckets'], histogram['buckets'])]
+                total['sum'] += histogram['sum']
+                total['count'] += histogram['count']
+
+    def save(self, path):
+        counters, histograms = self.snapshot()
+        data = {
+            'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+            'histograms': [[name, labels, histogram] for (name, labels), histogram in histograms.items()],
+        }
+        temp = f'{path}.tmp'
+        with open(temp, 'w') as f:
+            json.dump(data, f)
+        # Readers see either the previous file or this one, never a partial one.
+        os.replace(temp, path)
+
+    def load(self, path):
+        with open(path) as f:
+            data = json.load(f)
+
+        def key(name, labels):
+            return name, tuple(tuple(pair) for pair in labels)
+
+        self.merge({key(name, labels): value for name, labels, value in data['counters']},
+                   {key(name, labels): histogram for name, labels, histogram in data['histograms']})
+
+    def render(self, buckets=LATENCY_BUCKETS):
+        counters, histograms = self.snapshot()
+
+        samples = defaultdict(list)
+        for (name, labels), value in counters.items():
+            samples[name].append(f'{name}{format_labels(labels)} {value:g}')
+        for (name, labels), histogram in histograms.items():
+            for bound, count in zip(buckets, histogram['buckets']):
+                samples[name].append(f'{name}_bucket{format_labels(labels + (("le", f"{bound:g}"),))} {count}')
+            samples[name].append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {histogram["count"]}')
+            samples[name].append(f'{name}_sum{format_labels(labels)} {histogram["sum"]:g}')
+            samples[name].append(f'{name}_count{format_labels(labels)} {histogram["count"]}')
+
+        lines = []
+        for name, (kind, description) in METRICS.items():
+            if samples[name]:
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}', *sorted(samples[name])]
+        return '\n'.join(lines) + '\n'
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in labels)
+    return '{%s}' % ','.join(f'{key}="{value}"' for key, value in escaped)
+
+
+registry = Registry()
+
+_saved_at = 0
+_save_lock = threading.Lock()
+
+
+def get_process_path(directory, pid=None):
+    return os.path.join(directory, f'{pid or os.getpid()}.json')
+
+
+@contextmanager
+def locked(directory, operation):
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, operation)
+        yield
+
+
+def save_process_metrics(directory, force=False):
+    """
+    Write the registry of this process to ``directory``, at most once per
+    ``SAVE_INTERVAL`` seconds unless forced, so that any worker can serve the
+    metrics of all of them.
+    """
+    global _saved_at
+    if not _save_lock.acquire(blocking=force):
+        return
+    try:
+        if force or time.monotonic() - _saved_at >= SAVE_INTERVAL:
+            # Servers other than gunicorn do not create the directory on start.
+            os.makedirs(directory, exist_ok=True)
+            registry.save(get_process_path(directory))
+            _saved_at = time.monotonic()
+    finally:
+        _save_lock.release()
+
+
+def collect_metrics(directory):
+    """
+    Return a registry summing those saved by every worker process, including
+    the workers that exited since the server started.
+    """
+    save_process_metrics(directory, force=True)
+    total = Registry()
+    with locked(directory, fcntl.LOCK_SH):
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                try:
+                    total.load(os.path.join(directory, name))
+                except FileNotFoundError:
+                    pass
+    return total
+
+
+def archive_process_metrics(directory, pid):
+    """
+    Fold the registry saved by an exited worker into the archive, so that
+    its counts survive without a file per worker ever started.
+    """
+    path = get_process_path(directory, pid)
+    if not os.path.exists(path):
+        return
+    with locked(directory, fcntl.LOCK_EX):
+        archive = Registry()
+        archive_path = os.path.join(directory, ARCHIVE_NAME)
+        if os.path.exists(archive_path):
+            archive.load(archive_path)
+        archive.load(path)
+        archive.save(archive_path)
+        os.remove(path)
+
+
+def reset_metrics(directory):
+    """Start a server with an empty metrics directory."""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.tmp')):
+            os.remove(os.path.join(directory, name))
+
+
+class QueryRecorder:
+    """
+    A database execute wrapper counting the queries of one request, their
+    total time and how often each statement shape ran.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[IN_LIST.sub('IN (...)', sql)] += 1
+
+    def repeated(self, threshold):
+        """
+        Return the ``(sql, count)`` of the statements that ran more than
+        ``threshold`` times, the signature of a query in a loop (N+1).
+        """
+        return [(sql, count) for sql, count in self.shapes.most_common() if count > threshold]
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from utils.metrics import QueryRecorder, registry, save_process_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMetricsMiddleware:
+    """
+    Record each request's database queries, query time, render time and
+    latency in the metrics registry and the ``Server-Timing`` header, and log
+    statements that one request repeated more than
+    ``METRICS_REPEATED_QUERY_THRESHOLD`` times.
+
+    Under ASGI the query wrappers are installed from the thread that runs the
+    request's sync code, as database connections belong to a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = asyncio.iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        recorder = QueryRecorder()
+        request._render_duration = 0
+        with self.record_queries(recorder):
+            response = self.get_response(request)
+        return self.record(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        recorder = QueryRecorder()
+        request._render_duration = 0
+        stack = await sync_to_async(self.record_queries)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.record(request, response, recorder, time.perf_counter() - started)
+
+    def record_queries(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def record(self, request, response, recorder, duration):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.inc('http_requests_total', (('view', view), ('method', request.method),
+                                             ('status', response.status_code)))
+        labels = (('view', view),)
+        registry.observe('http_request_duration_seconds', labels, duration)
+        registry.inc('http_request_db_queries_total', labels, recorder.count)
+        registry.inc('http_request_db_duration_seconds_total', labels, recorder.duration)
+        registry.inc('http_request_render_duration_seconds_total', labels, request._render_duration)
+
+        repeated = recorder.repeated(settings.METRICS_REPEATED_QUERY_THRESHOLD)
+        if repeated:
+            registry.inc('http_request_repeated_queries_total', labels)
+            for sql, count in repeated:
+                logger.warning('%s %s ran the same query %d times: %s', request.method, view, count, sql)
+        if settings.METRICS_DIR:
+            save_process_metrics(settings.METRICS_DIR)
+
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+                f'render;dur={request._render_duration * 1000:.1f}, total;dur={duration * 1000:.1f}'
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered, which serializes them, right after this hook.
+        render_started = time.perf_counter()
+
+        def rendered(response):
+            request._render_duration = time.perf_counter() - render_started
+
+        response.add_post_render_callback(rendered)
+        return response
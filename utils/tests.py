@@ -0,0 +1,205 @@
+import asyncio
+import datetime
+import decimal
+import io
+import os
+import tempfile
+from collections import OrderedDict
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.sqlite3 import base as sqlite
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from utils.db import HealthCheckMixin
+from utils.metrics import (
+    QueryRecorder,
+    Registry,
+    archive_process_metrics,
+    get_process_path,
+    registry,
+    reset_metrics,
+)
+from utils.middleware import RequestMetricsMiddleware
+from utils.parsers import FastJSONParser
+from utils.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        data = OrderedDict([
+            ('first_name', 'Zoë'),
+            ('start_date', datetime.date(2020, 1, 1)),
+            ('modified_time', datetime.datetime(2023, 6, 12, 3, 14, 15, 926535, tzinfo=timezone.utc)),
+            ('rate', decimal.Decimal('4.5')),
+            ('duration', datetime.timedelta(hours=1)),
+            ('title', _('Skill')),
+            ('description', 'line\u2028separator\u2029'),
+            ('skills', [{'id': 1, 'end_date': None, 'graduated': True}]),
+            (1, 'numeric key'),
+        ])
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_stdlib(self):
+        data = {'skills': [1, 2]}
+        media_type = 'application/json; indent=4'
+        self.assertEqual(FastJSONRenderer().render(data, media_type), JSONRenderer().render(data, media_type))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTestCase(SimpleTestCase):
+    def test_matches_drf_parser(self):
+        body = '{"title": "Zoë", "rate": 4, "skills": [1.5, null, true]}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json(self):
+        for body in (b'{"title": ', b'NaN'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                FastJSONParser().parse(io.BytesIO(body))
+
+
+class HealthCheckDatabaseWrapper(HealthCheckMixin, sqlite.DatabaseWrapper):
+    pass
+
+
+class ConnectionHealthCheckTestCase(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = dict(connection.settings_dict, NAME=os.path.join(directory.name, 'db.sqlite3'),
+                             CONN_MAX_AGE=None, CONN_HEALTH_CHECKS=True)
+        self.connection = HealthCheckDatabaseWrapper(settings_dict, alias='health')
+        self.addCleanup(self.connection.close)
+        self.connection.ensure_connection()
+
+    def query(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_probes_on_first_use_in_request(self):
+        with mock.patch.object(self.connection, 'is_usable', return_value=True) as is_usable:
+            # A new connection needs no probe.
+            self.query()
+            is_usable.assert_not_called()
+
+            # A request that never uses the connection does not probe it either.
+            self.connection.close_if_unusable_or_obsolete()
+            self.connection.close_if_unusable_or_obsolete()
+            is_usable.assert_not_called()
+
+            self.query()
+            self.query()
+            is_usable.assert_called_once_with()
+
+    def test_replaces_dead_connection(self):
+        self.connection.close_if_unusable_or_obsolete()
+        dead = self.connection.connection
+        with mock.patch.object(self.connection, 'is_usable', return_value=False):
+            self.query()
+        self.assertIsNot(self.connection.connection, dead)
+
+    def test_disabled(self):
+        self.connection.settings_dict['CONN_HEALTH_CHECKS'] = False
+        self.connection.close_if_unusable_or_obsolete()
+        with mock.patch.object(self.connection, 'is_usable') as is_usable:
+            self.query()
+        is_usable.assert_not_called()
+
+
+class RequestMetricsTestCase(TestCase):
+    def setUp(self):
+        registry.clear()
+        user = get_user_model().objects.create_user(username='testuser', password='StrongPassword123')
+        self.client = APIClient()
+        self.authorization = f'Bearer {AccessToken.for_user(user)}'
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+        self.url = reverse('resumes:skills-list-create')
+
+    def test_server_timing(self):
+        response = self.client.get(self.url)
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'render', 'total'})
+        self.assertRegex(timing['db'], r'^dur=[\d.]+;desc="[1-9]\d* queries"$')
+
+    def test_metrics_endpoint(self):
+        self.client.get(self.url)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{view="resumes:skills-list-create",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{view="resumes:skills-list-create"} 1', body)
+        self.assertIn('http_request_db_queries_total{view="resumes:skills-list-create"}', body)
+
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_REPEATED_QUERY_THRESHOLD=0)
+    def test_logs_repeated_queries(self):
+        with self.assertLogs('utils.middleware', 'WARNING') as logs:
+            self.client.get(self.url)
+        self.assertIn('GET resumes:skills-list-create ran the same query', logs.output[0])
+        self.assertIn('http_request_repeated_queries_total{view="resumes:skills-list-create"} 1', registry.render())
+
+    async def test_async_requests(self):
+        self.assertTrue(asyncio.iscoroutinefunction(RequestMetricsMiddleware(mock.AsyncMock())))
+        self.assertFalse(asyncio.iscoroutinefunction(RequestMetricsMiddleware(mock.Mock())))
+
+        # Django 3.2's AsyncClient takes extra arguments as raw header names.
+        headers = {'authorization': self.authorization}
+        response = await AsyncClient().get(self.url, **headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('http_requests_total{view="resumes:skills-list-create",method="GET",status="200"} 1',
+                      registry.render())
+
+    def test_metrics_of_all_workers(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        reset_metrics(directory.name)
+        labels = (('view', 'resumes:skills-list-create'),)
+        for pid in (1001, 1002):
+            worker = Registry()
+            worker.inc('http_request_db_queries_total', labels, 2)
+            worker.observe('http_request_duration_seconds', labels, 0.02)
+            worker.save(get_process_path(directory.name, pid))
+        archive_process_metrics(directory.name, 1001)
+        self.assertFalse(os.path.exists(get_process_path(directory.name, 1001)))
+
+        with override_settings(METRICS_DIR=directory.name):
+            self.client.get(self.url)
+            body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="resumes:skills-list-create"} 3', body)
+        self.assertRegex(body, r'http_request_duration_seconds_bucket\{view="resumes:skills-list-create",le="0.025"\} [2-9]')
+        self.assertRegex(body, r'http_request_db_queries_total\{view="resumes:skills-list-create"\} ([5-9]|\d\d)')
+
+
+class QueryRecorderTestCase(SimpleTestCase):
+    def test_groups_statement_shapes(self):
+        recorder = QueryRecorder()
+        execute = mock.Mock()
+        for sql in ['SELECT * FROM skill WHERE id IN (%s)', 'SELECT * FROM skill WHERE id IN (%s, %s)',
+                    'SELECT * FROM skill WHERE id = %s']:
+            recorder(execute, sql, [], False, {})
+        self.assertEqual(recorder.count, 3)
+        self.assertEqual(recorder.repeated(1), [('SELECT * FROM skill WHERE id IN (...)', 2)])
+
+    def test_registry_renders_histogram(self):
+        metrics = Registry()
+        metrics.observe('http_request_duration_seconds', (('view', 'a"b'),), 0.02)
+        body = metrics.render()
+        self.assertIn('http_request_duration_seconds_bucket{view="a\\"b",le="0.01"} 0', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="a\\"b",le="0.025"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="a\\"b",le="+Inf"} 1', body)
+        self.assertIn('http_request_duration_seconds_sum{view="a\\"b"} 0.02', body)
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from utils.metrics import collect_metrics, registry
+
+
+@require_GET
+def metrics_view(request):
+    """
+    📈 Serve the metrics in the Prometheus text format, to
+    ``METRICS_ALLOWED_IPS`` only: those of every worker with ``METRICS_DIR``,
+    of this process otherwise.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    metrics = collect_metrics(settings.METRICS_DIR) if settings.METRICS_DIR else registry
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')